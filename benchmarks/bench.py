@@ -0,0 +1,273 @@
+"""Benchmarks of the request/response hot path of pychallonge.
+
+Run from the root of the repository:
+
+    $ python benchmarks/bench.py
+    $ python benchmarks/bench.py --sizes 10,1000 --save before.json
+    $ python benchmarks/bench.py --sizes 10,1000 --compare before.json
+
+Every benchmark runs on synthetic payloads of each size and reports the
+median time, the throughput in records per second and the peak memory
+allocated while it runs. --save stores the results as json and
+--compare prints the change against stored results, flagging the
+benchmarks which got slower than --threshold.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from challonge import api, matches  # noqa: E402
+from challonge.columns import Columns  # noqa: E402
+
+import fixtures  # noqa: E402
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register a benchmark.
+
+    The decorated function takes the size and returns (prepare, run):
+    prepare() builds the input of one run, which is not timed, and
+    run(input) is the timed code.
+    """
+
+    def register(func):
+        BENCHMARKS.append((name, func))
+        return func
+
+    return register
+
+
+class _StaticPool(object):
+    """Answer every request with the same body, without any network."""
+
+    def __init__(self, body):
+        self.body = body
+
+    def request(self, method, url, **kwargs):
+        response = requests.models.Response()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        response._content = self.body
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        pass
+
+
+def _parse_benchmark(make_records, record_type, datetime_type="local"):
+    def factory(size):
+        body = fixtures.body(make_records(size))
+
+        def run(data):
+            api.set_record_type(record_type)
+            api.set_datetime_type(datetime_type)
+            try:
+                return api._parse(data)
+            finally:
+                api.set_record_type()
+                api.set_datetime_type()
+
+        return lambda: json.loads(body), run
+
+    return factory
+
+
+for _record_type in api.RECORD_TYPES:
+    benchmark("parse_matches[%s]" % _record_type)(_parse_benchmark(fixtures.matches, _record_type))
+for _datetime_type in api.DATETIME_TYPES[1:]:
+    benchmark("parse_matches[dict,%s]" % _datetime_type)(
+        _parse_benchmark(fixtures.matches, "dict", _datetime_type)
+    )
+benchmark("parse_participants[dict]")(_parse_benchmark(fixtures.participants, "dict"))
+
+
+def _decode_benchmark(backend):
+    def factory(size):
+        response = _StaticPool(fixtures.body(fixtures.matches(size))).request("GET", None)
+
+        def run(_):
+            api.set_json_backend(backend)
+            try:
+                return api._decode(response)
+            finally:
+                api.set_json_backend()
+
+        return lambda: None, run
+
+    return factory
+
+
+for _backend in api.JSON_BACKENDS[1:]:
+    try:
+        importlib.import_module(_backend)
+    except ImportError:
+        continue
+    benchmark("decode_matches[%s]" % _backend)(_decode_benchmark(_backend))
+
+
+@benchmark("columns_matches")
+def _columns_matches(size):
+    body = fixtures.body(fixtures.matches(size))
+    return lambda: json.loads(body), lambda data: Columns.from_json("match", data)
+
+
+@benchmark("prepare_params[tournament]")
+def _prepare_tournament(size):
+    params = {
+        "name": "My Tournament",
+        "url": "my_tournament",
+        "tournament_type": "double elimination",
+        "open_signup": False,
+        "hold_third_place_match": True,
+        "pts_for_match_win": 1.0,
+        "check_in_duration": 30,
+        "start_at": fixtures._EPOCH,
+        "description": "A tournament",
+        "private": True,
+    }
+
+    def run(_):
+        for _ in range(size):
+            api._prepare_params(params, "tournament")
+
+    return lambda: None, run
+
+
+@benchmark("prepare_params[participants[]]")
+def _prepare_bulk(size):
+    params = {
+        "name": ["Player %d" % i for i in range(size)],
+        "misc": ["misc %d" % i for i in range(size)],
+        "invite_name_or_email": None,
+    }
+    return lambda: None, lambda _: api._prepare_params(params, "participants[]")
+
+
+def _fetch_benchmark(fetch):
+    def factory(size):
+        pool = _StaticPool(fixtures.body(fixtures.matches(size)))
+
+        def run(_):
+            previous = api.set_pool(pool)
+            try:
+                return fetch()
+            finally:
+                api.set_pool(previous)
+
+        return lambda: None, run
+
+    return factory
+
+
+benchmark("fetch_and_parse[matches]")(
+    _fetch_benchmark(lambda: api.fetch_and_parse("GET", "tournaments/1/matches"))
+)
+benchmark("iter_index[matches]")(_fetch_benchmark(lambda: sum(1 for _ in matches.iter_index(1))))
+
+
+def run_benchmark(factory, size, repeat, max_time):
+    prepare, run = factory(size)
+
+    times = []
+    started = time.time()
+    while len(times) < repeat and (len(times) < 3 or time.time() - started < max_time):
+        data = prepare()
+        t0 = time.perf_counter()
+        run(data)
+        times.append(time.perf_counter() - t0)
+        del data
+
+    data = prepare()
+    tracemalloc.start()
+    run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    median = times[len(times) // 2]
+    return {
+        "size": size,
+        "runs": len(times),
+        "median": median,
+        "min": times[0],
+        "records_per_s": size / median if median else None,
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print the change of every result against the baseline.
+
+    :return
+        the names of the benchmarks slower than the threshold
+    """
+    regressions = []
+    print("\n%-40s %12s %12s %9s" % ("benchmark", "before", "after", "change"))
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        change = result["median"] / before["median"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(
+            "%-40s %10.3fms %10.3fms %+8.1f%%%s"
+            % (key, before["median"] * 1e3, result["median"] * 1e3, change * 100, flag)
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="10,1000,100000", help="comma separated sizes")
+    parser.add_argument("--filter", default="", help="run the benchmarks containing this text")
+    parser.add_argument("--repeat", type=int, default=7, help="maximum runs of each benchmark")
+    parser.add_argument("--max-time", type=float, default=2.0, help="seconds per benchmark")
+    parser.add_argument("--save", help="store the results in this json file")
+    parser.add_argument("--compare", help="compare with the results stored in this json file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = {}
+    print("%-40s %12s %14s %12s" % ("benchmark", "median", "records/s", "peak mem"))
+    for name, factory in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        for size in sizes:
+            key = "%s/%d" % (name, size)
+            result = results[key] = run_benchmark(factory, size, args.repeat, args.max_time)
+            print(
+                "%-40s %10.3fms %14.0f %9.1fKiB"
+                % (key, result["median"] * 1e3, result["records_per_s"], result["peak_kib"])
+            )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {"python": sys.version.split()[0], "results": results}, f, indent=2, sort_keys=True
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
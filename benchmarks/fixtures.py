@@ -0,0 +1,112 @@
+"""Synthetic Challonge API payloads of realistic shape and size."""
+import datetime
+import json
+import random
+
+_EPOCH = datetime.datetime(2021, 3, 1, 12, 0, 0)
+
+
+def _timestamp(rng, offset):
+    dt = _EPOCH + datetime.timedelta(seconds=offset + rng.randint(0, 3600))
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + "%03d-04:00" % rng.randint(0, 999)
+
+
+def match(rng, i, tournament_id=1):
+    p1, p2 = 1000 + 2 * i, 1001 + 2 * i
+    complete = rng.random() < 0.7
+    return {
+        "match": {
+            "id": 100000 + i,
+            "tournament_id": tournament_id,
+            "state": "complete" if complete else rng.choice(("open", "pending")),
+            "player1_id": p1,
+            "player2_id": p2,
+            "player1_prereq_match_id": 100000 + i // 2 if i > 1 else None,
+            "player2_prereq_match_id": 100000 + i // 2 + 1 if i > 1 else None,
+            "player1_is_prereq_match_loser": False,
+            "player2_is_prereq_match_loser": False,
+            "winner_id": p1 if complete else None,
+            "loser_id": p2 if complete else None,
+            "started_at": _timestamp(rng, i * 60),
+            "created_at": _timestamp(rng, 0),
+            "updated_at": _timestamp(rng, i * 60 + 600),
+            "identifier": "A%d" % i,
+            "has_attachment": False,
+            "round": 1 + i % 8,
+            "player1_votes": None,
+            "player2_votes": None,
+            "group_id": None,
+            "attachment_count": None,
+            "scheduled_time": None,
+            "location": None,
+            "underway_at": None,
+            "optional": False,
+            "rushb_id": None,
+            "completed_at": _timestamp(rng, i * 60 + 600) if complete else None,
+            "suggested_play_order": i + 1,
+            "forfeited": None,
+            "open_graph_image_file_name": None,
+            "open_graph_image_content_type": None,
+            "open_graph_image_file_size": None,
+            "prerequisite_match_ids_csv": "%d,%d" % (100000 + i // 2, 100001 + i // 2),
+            "scores_csv": "%d-%d" % (rng.randint(0, 5), rng.randint(0, 5)) if complete else "",
+        }
+    }
+
+
+def participant(rng, i, tournament_id=1):
+    return {
+        "participant": {
+            "id": 1000 + i,
+            "tournament_id": tournament_id,
+            "name": "Player %d" % i,
+            "seed": i + 1,
+            "active": True,
+            "created_at": _timestamp(rng, 0),
+            "updated_at": _timestamp(rng, 60),
+            "invite_email": None,
+            "final_rank": None,
+            "misc": None,
+            "icon": None,
+            "on_waiting_list": False,
+            "invitation_id": None,
+            "group_id": None,
+            "checked_in_at": _timestamp(rng, 30) if rng.random() < 0.5 else None,
+            "ranked_member_id": None,
+            "custom_field_response": None,
+            "clinch": None,
+            "integration_uids": None,
+            "challonge_username": None,
+            "challonge_email_address_verified": None,
+            "removable": True,
+            "participatable_or_invitation_attached": False,
+            "confirm_remove": True,
+            "invitation_pending": False,
+            "display_name_with_invitation_email_address": "Player %d" % i,
+            "email_hash": None,
+            "username": None,
+            "display_name": "Player %d" % i,
+            "attached_participatable_portrait_url": None,
+            "can_check_in": False,
+            "checked_in": False,
+            "reactivatable": False,
+            "check_in_open": False,
+            "group_player_ids": [],
+            "has_irrelevant_seed": False,
+        }
+    }
+
+
+def matches(n, seed=0):
+    rng = random.Random(seed)
+    return [match(rng, i) for i in range(n)]
+
+
+def participants(n, seed=0):
+    rng = random.Random(seed)
+    return [participant(rng, i) for i in range(n)]
+
+
+def body(records):
+    """Return the json response body of a list of records."""
+    return json.dumps(records).encode("utf-8")
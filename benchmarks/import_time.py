@@ -0,0 +1,76 @@
+"""Benchmark of the time taken by `import challonge`.
+
+Run from the root of the repository:
+
+    $ python benchmarks/import_time.py
+    $ python benchmarks/import_time.py --module challonge.aio --max-ms 50
+
+Every run imports the module in a fresh interpreter with -X importtime
+and reports the median cumulative import time and the slowest modules
+it imported. With --max-ms the exit status is 1 when the median is
+above that many milliseconds, ex. to keep the startup cost low in CI.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module=None):
+    """Import module in a new interpreter.
+
+    :return
+        a dict by module name of the cumulative import times in
+        microseconds of the modules imported by `import module`, and
+        by the interpreter startup
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % module if module else "pass"],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:  # the header
+            pass
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--module", default="challonge")
+    parser.add_argument("--runs", type=int, default=9)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules shown")
+    parser.add_argument("--max-ms", type=float, help="fail above this median import time")
+    args = parser.parse_args(argv)
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = sorted(times[args.module] for times in runs)
+    median = totals[len(totals) // 2] / 1000.0
+    print("import %s: median %.1fms, min %.1fms" % (args.module, median, totals[0] / 1000.0))
+
+    # leave out the modules imported on startup, ex. by site
+    startup = import_times()
+    last = [item for item in runs[-1].items() if item[0] not in startup]
+    slowest = sorted(last, key=lambda item: -item[1])[1 : args.top + 1]
+    for name, us in slowest:
+        print("  %8.1fms  %s" % (us / 1000.0, name))
+
+    if args.max_ms is not None and median > args.max_ms:
+        print("import %s is slower than %.1fms" % (args.module, args.max_ms))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,28 @@
 from challonge import tournaments, matches, participants, attachments
 from challonge.api import (
+    Challonge,
+    get_client,
     set_credentials,
     get_credentials,
     set_timezone,
     get_timezone,
     set_user_agent,
+    get_user_agent,
+    set_record_type,
+    get_record_type,
+    set_datetime_type,
+    get_datetime_type,
+    set_json_backend,
+    get_json_backend,
     fetch,
+    configure_pool,
+    close_pool,
+    configure_cache,
+    configure_store,
+    configure_rate_limit,
+    configure_retries,
+    add_hook,
+    remove_hook,
+    set_coalescing,
     ChallongeException,
 )
@@ -0,0 +1,22 @@
+"""asyncio client for the Challonge API.
+
+The modules of this package mirror challonge.tournaments,
+challonge.matches, challonge.participants and challonge.attachments,
+but every function is a coroutine::
+
+    from challonge import aio
+
+    async def main():
+        t = await aio.tournaments.show(3272)
+        ms = await aio.matches.index(t["id"])
+        await aio.close_pool()
+
+Requires aiohttp.
+"""
+from challonge.aio import tournaments, matches, participants, attachments
+from challonge.aio.api import (
+    fetch,
+    fetch_and_parse,
+    configure_pool,
+    close_pool,
+)
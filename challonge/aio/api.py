@@ -0,0 +1,199 @@
+"""asyncio counterparts of the challonge.api request functions.
+
+The credentials, the timezone and the user agent are those of the
+default client of challonge.api, so set_credentials(), set_timezone()
+and set_user_agent() apply to both. The requests are sent with aiohttp.
+"""
+import asyncio
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError("challonge.aio requires aiohttp. Install it with: pip install aiohttp")
+
+from challonge import api
+
+
+class ConnectionPool(object):
+    """A pool of keep-alive connections used by the coroutines of challonge.aio.
+
+    The underlying aiohttp session is created on the first request,
+    inside the running event loop. If the pool is later used from
+    another event loop a new session is created for it.
+
+    The pool can be used as an async context manager, which closes all
+    of its connections on exit.
+
+    :keyword param pool_size: the maximum number of simultaneous connections
+    :keyword param timeout: seconds to wait for the server, either a
+        number or a (connect timeout, read timeout) tuple.
+        None waits forever
+    :keyword param keep_alive: if False every connection is closed
+        after its response has been read
+    """
+
+    def __init__(self, pool_size=100, timeout=None, keep_alive=True):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self._session = None
+        self._loop = None
+
+    def _client_timeout(self):
+        if self.timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(self.timeout, (tuple, list)):
+            connect, read = self.timeout
+            return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    def _get_session(self):
+        loop = asyncio.get_event_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self._client_timeout()
+            )
+            self._loop = loop
+        return self._session
+
+    async def request(self, method, url, **kwargs):
+        """Send a request over one of the pooled connections.
+
+        The body of the response is read before it is returned.
+        """
+        async with self._get_session().request(method, url, **kwargs) as response:
+            await response.read()
+        return response
+
+    async def close(self):
+        """Close all the open connections."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+_pool = None
+# the futures of the GET requests in flight, by event loop and request
+_flights = {}
+
+
+def get_pool():
+    """Return the connection pool used by fetch(), creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool()
+    return _pool
+
+
+def set_pool(pool):
+    """Use the given ConnectionPool for all the requests.
+
+    :return
+        the previously used pool (or None), which is not closed
+    """
+    global _pool
+    previous, _pool = _pool, pool
+    return previous
+
+
+def configure_pool(pool_size=100, timeout=None, keep_alive=True):
+    """Replace the connection pool with a new one using the given options.
+
+    Connections of the previous pool are not closed, use close_pool()
+    before calling this if you need to.
+
+    :return
+        the new ConnectionPool
+    """
+    set_pool(ConnectionPool(pool_size, timeout, keep_alive))
+    return _pool
+
+
+async def close_pool():
+    """Close all the connections of the connection pool in use."""
+    if _pool is not None:
+        await _pool.close()
+
+
+def _clean_params(params):
+    # aiohttp does not drop empty values like requests does
+    return [(k, v) for k, v in params if v is not None]
+
+
+async def fetch(method, uri, params_prefix=None, **params):
+    """Fetch the given uri and return the response with its body read.
+
+    If coalescing is enabled (see challonge.api.set_coalescing) the
+    identical GET requests of the event loop share the response of the
+    request in flight.
+    """
+    if method != "GET" or not api.get_client().get_coalescing():
+        return await _fetch(method, uri, params_prefix, params)
+
+    loop = asyncio.get_event_loop()
+    key = loop, uri, tuple(api._prepare_params(params, params_prefix))
+    flight = _flights.get(key)
+    if flight is not None:
+        try:
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            if not flight.cancelled():
+                raise
+        # the request was cancelled, send this one on its own
+        return await _fetch(method, uri, params_prefix, params)
+
+    flight = _flights[key] = loop.create_future()
+    try:
+        response = await _fetch(method, uri, params_prefix, params)
+    except Exception as e:
+        flight.set_exception(e)
+        flight.exception()  # retrieved, even if no request is waiting for it
+        raise
+    except BaseException:
+        flight.cancel()
+        raise
+    else:
+        flight.set_result(response)
+        return response
+    finally:
+        del _flights[key]
+
+
+async def _fetch(method, uri, params_prefix, params):
+    params = _clean_params(api._prepare_params(params, params_prefix))
+
+    if method == "POST" or method == "PUT":
+        r_data = {"data": params}
+    else:
+        r_data = {"params": params}
+
+    url = "https://%s/%s.json" % (api.CHALLONGE_API_URL, uri)
+    client = api.get_client()
+    user, key = client.get_credentials()
+    auth = aiohttp.BasicAuth(user, key) if user is not None else None
+
+    response = await get_pool().request(
+        method, url, headers={"User-Agent": client.get_user_agent()}, auth=auth, **r_data
+    )
+    if response.status >= 400:
+        if response.status != 422:
+            response.raise_for_status()
+        # wrap up application-level errors
+        doc = api._loads(await response.read())
+        if doc.get("errors"):
+            raise api.ChallongeException(*doc["errors"])
+
+    return response
+
+
+async def fetch_and_parse(method, uri, params_prefix=None, **params):
+    """Fetch the given uri and return python dictionary with parsed data-types."""
+    response = await fetch(method, uri, params_prefix, **params)
+    return api._parse(api._loads(await response.read()))
@@ -0,0 +1,42 @@
+from challonge.aio import api
+
+
+async def index(tournament, match):
+    """Retrieve a set of attachments created for a specific match."""
+    return await api.fetch_and_parse(
+        "GET", "tournaments/%s/matches/%s/attachments" % (tournament, match)
+    )
+
+
+async def create(tournament, match, **params):
+    """Create a new attachment for the specific match."""
+    return await api.fetch_and_parse(
+        "POST",
+        "tournaments/%s/matches/%s/attachments" % (tournament, match),
+        "match_attachment",
+        **params
+    )
+
+
+async def show(tournament, match, attachment):
+    """Retrieve a single match attachment record."""
+    return await api.fetch_and_parse(
+        "GET", "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment)
+    )
+
+
+async def update(tournament, match, attachment, **params):
+    """Update the attributes of a match attachment."""
+    await api.fetch(
+        "PUT",
+        "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment),
+        "match_attachment",
+        **params
+    )
+
+
+async def destroy(tournament, match, attachment):
+    """Delete a match attachment."""
+    await api.fetch(
+        "DELETE", "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment)
+    )
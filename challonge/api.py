@@ -1,146 +1,1100 @@
+import codecs
+import datetime
+import importlib
 import json
-import iso8601
-import tzlocal
-import pytz
+import re
 import itertools
 import sys
-from requests import request
-from requests.exceptions import HTTPError
+import threading
+import time
+from challonge import metrics, schema, throttle
+from challonge.cache import ResponseCache
+from challonge.records import LazyRecord, RECORD_CLASSES
 
 PY2 = sys.version_info[0] == 2
 TEXT_TYPE = unicode if PY2 else str
-tz = tzlocal.get_localzone()
-user_agent = "pychallonge-1.11.5"
+# requests, iso8601, pytz and tzlocal are imported on first use to keep
+# `import challonge` fast. The local timezone is also detected on first use
+USER_AGENT = "pychallonge-1.11.5"
 
 CHALLONGE_API_URL = "api.challonge.com/v1"
 
-_credentials = {
-    "user": None,
-    "api_key": None,
-}
+# bytes read at a time from the responses of fetch_and_iter()
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class ChallongeException(Exception):
     pass
 
 
-def set_credentials(username, api_key):
-    """Set the challonge.com api credentials to use."""
-    _credentials["user"] = username
-    _credentials["api_key"] = api_key
+class ConnectionPool(object):
+    """A thread-safe pool of keep-alive HTTP connections to challonge.com.
 
+    Every request made by the tournaments, matches, participants and
+    attachments modules goes through the pool returned by get_pool(),
+    or by the get_pool() method of a Challonge client, so the TCP and
+    TLS connections are reused between calls instead of
+    being opened for every request.
 
-def set_user_agent(agent):
-    """Set User-Agent in the HTTP requests.
+    The pool can be used as a context manager, which closes all of its
+    connections on exit.
 
-    :keyword param agent: string
-    ex. 'test agent 1'
+    :keyword param pool_size: the maximum number of connections kept open
+    :keyword param timeout: seconds to wait for the server, either a
+        number or a (connect timeout, read timeout) tuple.
+        None waits forever
+    :keyword param keep_alive: if False every connection is closed
+        after its response has been read
     """
-    global user_agent
-    user_agent = agent
 
+    def __init__(self, pool_size=10, timeout=None, keep_alive=True):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self._session = None
+        self._lock = threading.Lock()
 
-def set_timezone(new_tz=None):
-    """Set the timezone for datetime fields.
-    By default is your machine's time.
-    If it's called without parameter sets the
-    local time again.
+    def _get_session(self):
+        session = self._session
+        if session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from requests.compat import cookielib
 
-    :keyword param new_tz: timezone string
-    ex. 'Europe/Athens',
-        'Asia/Seoul',
-        'America/Los_Angeles',
-        'UTC'
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session = requests.Session()
+                    # the api authenticates every request, a cookie set by
+                    # one client of a shared pool must not be sent by the others
+                    session.cookies.set_policy(cookielib.DefaultCookiePolicy(allowed_domains=[]))
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+                session = self._session
+        return session
+
+    def request(self, method, url, **kwargs):
+        """Send a request over one of the pooled connections."""
+        kwargs.setdefault("timeout", self.timeout)
+        if not self.keep_alive:
+            headers = dict(kwargs.get("headers") or {})
+            headers["Connection"] = "close"
+            kwargs["headers"] = headers
+        return self._get_session().request(method, url, **kwargs)
+
+    def close(self):
+        """Close all the open connections.
+
+        The pool can still be used afterwards, new connections are
+        opened on the next request.
+        """
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+RECORD_TYPES = ("dict", "lazy", "record")
+JSON_BACKENDS = ("auto", "json", "orjson", "ujson")
+DATETIME_TYPES = ("local", "utc", "epoch", "iso")
+
+json_backend = "auto"
+# the name and the loads() function of the json library in use,
+# set on the first decode unless set_json_backend() is called before
+_json_name = None
+_json_loads = None
+
+
+def set_json_backend(backend="auto"):
+    """Set the json library used to decode the responses.
+
+    :keyword param backend: one of
+        'auto': orjson if it is installed, else json (default)
+        'json': the json module of the standard library
+        'orjson': orjson, which decodes large responses several
+                  times faster
+        'ujson': ujson
 
     :return
         None
     """
-    global tz
-    if new_tz:
-        tz = pytz.timezone(new_tz)
+    global json_backend, _json_name, _json_loads
+    if backend not in JSON_BACKENDS:
+        raise ValueError(
+            "json backend must be one of %s, not %r" % (", ".join(JSON_BACKENDS), backend)
+        )
+    if backend == "auto":
+        try:
+            module = importlib.import_module("orjson")
+        except ImportError:
+            module = json
     else:
-        tz = tzlocal.get_localzone()
+        module = importlib.import_module(backend)
+    json_backend = backend
+    _json_name, _json_loads = module.__name__, module.loads
+    if module is json and (3,) <= sys.version_info < (3, 6):
+        _json_loads = _loads_text
 
 
-def get_credentials():
-    """Retrieve the challonge.com credentials set with set_credentials()."""
-    return _credentials["user"], _credentials["api_key"]
+def _loads_text(data):
+    # json.loads() of Python 3.4 and 3.5 only reads strings
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
 
 
-def get_timezone():
-    """Return currently timezone in use."""
-    return tz
+def get_json_backend():
+    """Return the name of the json library used to decode the responses, ex. 'orjson'."""
+    if _json_loads is None:
+        set_json_backend(json_backend)
+    return _json_name
 
 
-def fetch(method, uri, params_prefix=None, **params):
-    """Fetch the given uri and return the contents of the response."""
-    params = _prepare_params(params, params_prefix)
+class Challonge(object):
+    """A client of the challonge.com api with its own settings.
 
-    if method == "POST" or method == "PUT":
-        r_data = {"data": params}
-    else:
-        r_data = {"params": params}
+    Every client has its own credentials, timezone, record and datetime
+    types, connection pool, response cache, tournament store, rate
+    limiter, retry policy and hooks, so the clients of several accounts
+    can be used by different threads at the same time. Its
+    tournaments, matches, participants and attachments attributes have
+    the functions of the modules of the same names:
 
-    # build the HTTP request and use basic authentication
-    url = "https://%s/%s.json" % (CHALLONGE_API_URL, uri)
+        client = challonge.Challonge("username", "api key", timezone="UTC")
+        client.tournaments.show("my_tourney")
 
-    try:
-        response = request(
-            method, url, headers={"User-Agent": user_agent}, auth=get_credentials(), **r_data
+    The functions of the challonge package and of its modules use the
+    default client returned by get_client(). The json backend is shared
+    by all the clients.
+
+    The client can be used as a context manager, which closes the
+    connections of its pool on exit.
+
+    :keyword param username: the challonge.com username
+    :keyword param api_key: the challonge.com api key
+    :keyword param timezone: the timezone of the datetime fields,
+        ex. 'Europe/Athens'. None uses the machine's timezone
+    :keyword param user_agent: the User-Agent of the HTTP requests
+    :keyword param record_type: see set_record_type()
+    :keyword param datetime_type: see set_datetime_type()
+    :keyword param pool: the ConnectionPool of the requests. None
+        creates one on the first request
+    :keyword param cache: a challonge.cache.ResponseCache or None
+    :keyword param store: a challonge.store.TournamentStore or None
+    :keyword param rate_limiter: a challonge.throttle.RateLimiter or None
+    :keyword param retry_policy: a challonge.throttle.RetryPolicy or None
+    :keyword param coalesce: share identical concurrent GET requests,
+        see set_coalescing()
+    """
+
+    def __init__(
+        self,
+        username=None,
+        api_key=None,
+        timezone=None,
+        user_agent=USER_AGENT,
+        record_type="dict",
+        datetime_type="local",
+        pool=None,
+        cache=None,
+        store=None,
+        rate_limiter=None,
+        retry_policy=None,
+        coalesce=False,
+    ):
+        self._credentials = {"user": username, "api_key": api_key}
+        self.tz = None
+        self.user_agent = user_agent
+        self.record_type = "dict"
+        self.datetime_type = "local"
+        self._cache = cache
+        self._store = store
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._pool = pool
+        self._pool_lock = threading.Lock()
+        self._hooks = ()
+        self._hooks_lock = threading.Lock()
+        self._resources = {}
+        # the GET requests in flight by key, None when coalescing is disabled
+        self._flights = {} if coalesce else None
+        self._flights_lock = threading.Lock()
+        self.set_timezone(timezone)
+        self.set_record_type(record_type)
+        self.set_datetime_type(datetime_type)
+
+    @property
+    def tournaments(self):
+        """The functions of challonge.tournaments using this client."""
+        return self._resource("tournaments")
+
+    @property
+    def matches(self):
+        """The functions of challonge.matches using this client."""
+        return self._resource("matches")
+
+    @property
+    def participants(self):
+        """The functions of challonge.participants using this client."""
+        return self._resource("participants")
+
+    @property
+    def attachments(self):
+        """The functions of challonge.attachments using this client."""
+        return self._resource("attachments")
+
+    def _resource(self, name):
+        resource = self._resources.get(name)
+        if resource is None:
+            # imported here, the resource modules import this one
+            module = importlib.import_module("challonge." + name)
+            resource = self._resources[name] = getattr(module, name.capitalize())(self)
+        return resource
+
+    def set_credentials(self, username, api_key):
+        """Set the challonge.com api credentials to use."""
+        self._credentials["user"] = username
+        self._credentials["api_key"] = api_key
+
+    def get_credentials(self):
+        """Retrieve the challonge.com credentials set with set_credentials()."""
+        return self._credentials["user"], self._credentials["api_key"]
+
+    def set_user_agent(self, agent):
+        """Set User-Agent in the HTTP requests.
+
+        :keyword param agent: string
+        ex. 'test agent 1'
+        """
+        self.user_agent = agent
+
+    def get_user_agent(self):
+        """Return the User-Agent of the HTTP requests."""
+        return self.user_agent
+
+    def set_timezone(self, new_tz=None):
+        """Set the timezone for datetime fields.
+        By default is your machine's time.
+        If it's called without parameter sets the
+        local time again.
+
+        :keyword param new_tz: timezone string
+        ex. 'Europe/Athens',
+            'Asia/Seoul',
+            'America/Los_Angeles',
+            'UTC'
+
+        :return
+            None
+        """
+        if new_tz:
+            import pytz
+
+            self.tz = pytz.timezone(new_tz)
+        else:
+            self.tz = None
+
+    def get_timezone(self):
+        """Return currently timezone in use."""
+        if self.tz is None:
+            import tzlocal
+
+            self.tz = tzlocal.get_localzone()
+        return self.tz
+
+    def set_record_type(self, new_record_type="dict"):
+        """Set the type of the records returned by fetch_and_parse().
+
+        :keyword param new_record_type: one of
+            'dict': plain dictionaries with every field converted (default)
+            'lazy': dictionary-like records which convert each field
+                    on first access, see challonge.records.LazyRecord
+            'record': compact read-only records with __slots__,
+                      ex. challonge.records.Match. Their fields can be read
+                      as attributes or like dictionary items
+
+        :return
+            None
+        """
+        if new_record_type not in RECORD_TYPES:
+            raise ValueError(
+                "record type must be one of %s, not %r" % (", ".join(RECORD_TYPES), new_record_type)
+            )
+        self.record_type = new_record_type
+
+    def get_record_type(self):
+        """Return the type of the records returned by fetch_and_parse()."""
+        return self.record_type
+
+    def set_datetime_type(self, new_datetime_type="local"):
+        """Set how fetch_and_parse() returns the datetime fields.
+
+        :keyword param new_datetime_type: one of
+            'local': datetimes in the timezone set with set_timezone() (default)
+            'utc': datetimes in UTC
+            'epoch': float seconds since 1970-01-01 UTC
+            'iso': the ISO 8601 strings sent by challonge.com, unparsed
+
+        The fields of 'lazy' records are converted on first access, with
+        the datetime type set at that time.
+
+        :return
+            None
+        """
+        if new_datetime_type not in DATETIME_TYPES:
+            raise ValueError(
+                "datetime type must be one of %s, not %r"
+                % (", ".join(DATETIME_TYPES), new_datetime_type)
+            )
+        self.datetime_type = new_datetime_type
+
+    def get_datetime_type(self):
+        """Return how fetch_and_parse() returns the datetime fields."""
+        return self.datetime_type
+
+    def get_cache(self):
+        """Return the ResponseCache in use or None if caching is disabled."""
+        return self._cache
+
+    def set_cache(self, cache):
+        """Cache the responses of GET requests in the given ResponseCache.
+
+        :keyword param cache: a challonge.cache.ResponseCache or None
+            to disable caching
+        """
+        self._cache = cache
+
+    def configure_cache(self, maxsize=256, ttl=0):
+        """Cache the responses of GET requests in a new ResponseCache.
+
+        Cached responses are revalidated with the ETag and Last-Modified
+        headers, so unchanged responses are not downloaded again. See
+        challonge.cache.ResponseCache for the details.
+
+        :keyword param maxsize: the maximum number of cached responses
+        :keyword param ttl: seconds a response is served from memory
+            before it is revalidated
+
+        :return
+            the new ResponseCache
+        """
+        self.set_cache(ResponseCache(maxsize, ttl))
+        return self._cache
+
+    def get_store(self):
+        """Return the TournamentStore in use or None if it is disabled."""
+        return self._store
+
+    def set_store(self, store):
+        """Serve the completed tournaments from the given TournamentStore.
+
+        :keyword param store: a challonge.store.TournamentStore or None
+            to disable it
+        """
+        self._store = store
+
+    def configure_store(self, path, ttl=None):
+        """Store the responses of completed tournaments in a SQLite database.
+
+        The matches, participants and attachments of a tournament do not
+        change once it is complete, so they are downloaded once and then
+        read from the database, also by later runs. See
+        challonge.store.TournamentStore for the details.
+
+        :param path: the path of the database file
+        :keyword param ttl: seconds a response is served before it is
+            downloaded again. None serves it forever
+
+        :return
+            the new TournamentStore
+        """
+        from challonge.store import TournamentStore
+
+        self.set_store(TournamentStore(path, ttl))
+        return self._store
+
+    def set_rate_limiter(self, limiter):
+        """Send all the requests through the given RateLimiter.
+
+        :keyword param limiter: a challonge.throttle.RateLimiter or None
+            to disable rate limiting
+        """
+        self._rate_limiter = limiter
+
+    def configure_rate_limit(self, rate, burst=None):
+        """Limit the requests to `rate` per second across all threads.
+
+        :param rate: the sustained number of requests per second
+        :keyword param burst: the number of requests that can be sent at once
+
+        :return
+            the new RateLimiter
+        """
+        self.set_rate_limiter(throttle.RateLimiter(rate, burst))
+        return self._rate_limiter
+
+    def set_retry_policy(self, policy):
+        """Retry failed requests according to the given RetryPolicy.
+
+        :keyword param policy: a challonge.throttle.RetryPolicy or None
+            to disable retries
+        """
+        self._retry_policy = policy
+
+    def configure_retries(self, max_retries=3, backoff=0.5, max_backoff=30.0, max_elapsed=60.0):
+        """Retry requests which failed with 429, 5xx or connection errors.
+
+        See challonge.throttle.RetryPolicy for the details.
+
+        :keyword param max_retries: the maximum retries of a request
+        :keyword param backoff: the base wait in seconds, it doubles on
+            every retry and a random jitter is applied
+        :keyword param max_backoff: the maximum wait between two attempts
+        :keyword param max_elapsed: the time budget of a request in seconds
+
+        :return
+            the new RetryPolicy
+        """
+        self.set_retry_policy(throttle.RetryPolicy(max_retries, backoff, max_backoff, max_elapsed))
+        return self._retry_policy
+
+    def get_pool(self):
+        """Return the connection pool used by fetch(), creating it on first use."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool()
+        return self._pool
+
+    def set_pool(self, pool):
+        """Use the given ConnectionPool for all the requests.
+
+        :return
+            the previously used pool (or None), which is not closed
+        """
+        with self._pool_lock:
+            previous, self._pool = self._pool, pool
+        return previous
+
+    def configure_pool(self, pool_size=10, timeout=None, keep_alive=True):
+        """Replace the connection pool with a new one using the given options.
+
+        The connections of the previous pool are closed.
+
+        :keyword param pool_size: the maximum number of connections kept open
+        :keyword param timeout: seconds to wait for the server, either a
+            number or a (connect timeout, read timeout) tuple
+        :keyword param keep_alive: reuse the connections between requests
+
+        :return
+            the new ConnectionPool. It can be used as a context manager
+            to close its connections when you are done
+            ex. with configure_pool(pool_size=20):
+                    ...
+        """
+        previous = self.set_pool(ConnectionPool(pool_size, timeout, keep_alive))
+        if previous is not None:
+            previous.close()
+        return self._pool
+
+    def close_pool(self):
+        """Close all the connections of the connection pool in use."""
+        if self._pool is not None:
+            self._pool.close()
+
+    def close(self):
+        """Close all the connections of the client."""
+        self.close_pool()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def set_coalescing(self, enabled=True):
+        """Share the response of a GET request with the identical requests sent meanwhile.
+
+        While a GET request is in flight, the threads sending the same
+        request with the same parameters wait for its response instead of
+        sending their own, and each parses it. If the request fails they
+        all get its exception. Streamed requests are never shared.
+
+        :keyword param enabled: False sends every request on its own (default)
+
+        :return
+            None
+        """
+        with self._flights_lock:
+            self._flights = {} if enabled else None
+
+    def get_coalescing(self):
+        """Return whether identical concurrent GET requests are shared."""
+        return self._flights is not None
+
+    def add_hook(self, hook):
+        """Call hook(event) after every request with a challonge.metrics.RequestEvent.
+
+        The hooks are called in the thread which sent the request, so they
+        should be quick. Exceptions raised by a hook are logged and ignored.
+        """
+        with self._hooks_lock:
+            self._hooks = self._hooks + (hook,)
+
+    def remove_hook(self, hook):
+        """Stop calling a hook added with add_hook()."""
+        with self._hooks_lock:
+            hooks = list(self._hooks)
+            hooks.remove(hook)
+            self._hooks = tuple(hooks)
+
+    def fetch(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and return the contents of the response."""
+        hooks = self._hooks
+        if not hooks:
+            return self._fetch(method, uri, params_prefix, params)
+        with _Probe(method, uri, hooks) as probe:
+            return self._fetch(method, uri, params_prefix, params, probe)
+
+    def fetch_and_parse(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and return python dictionary with parsed data-types."""
+        hooks = self._hooks
+        if not hooks:
+            data = _decode(self._fetch(method, uri, params_prefix, params))
+            self._learn(method, uri, data)
+            return self._parse(data)
+        with _Probe(method, uri, hooks) as probe:
+            response = self._fetch(method, uri, params_prefix, params, probe)
+            started = time.time()
+            data = _decode(response)
+            self._learn(method, uri, data)
+            data = self._parse(data)
+            probe.parse = time.time() - started
+            return data
+
+    def _learn(self, method, uri, data):
+        """Tell the store and the response cache about the tournaments of a decoded response."""
+        if method != "GET":
+            return
+        store, cache = self._store, self._cache
+        if store is not None:
+            store.learn(uri, data)
+        if cache is not None:
+            cache.learn(uri, data)
+
+    def fetch_and_iter(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and yield the parsed records one at a time.
+
+        The records are decoded while the response body is downloaded,
+        so the whole response is never held in memory. The request is sent
+        when the first record is requested and its connection is released
+        when the generator is exhausted or closed.
+        """
+        hooks = self._hooks
+        if not hooks:
+            response = self._request(method, uri, params_prefix, params, stream=True)
+            try:
+                chunks = response.iter_content(STREAM_CHUNK_SIZE)
+                for data in _iter_json(chunks):
+                    yield self._parse(data)
+            finally:
+                response.close()
+            return
+
+        with _Probe(method, uri, hooks) as probe:
+            response = self._request(method, uri, params_prefix, params, stream=True, probe=probe)
+            try:
+                started = time.time()
+                chunks = probe.read(response.iter_content(STREAM_CHUNK_SIZE))
+                for data in _iter_json(chunks):
+                    yield self._parse(data)
+                # the records are parsed while the body is read
+                probe.parse = time.time() - started - probe.download
+            finally:
+                response.close()
+
+    def _fetch(self, method, uri, params_prefix, params, probe=None):
+        """Send a request, or wait for the identical GET request in flight."""
+        flights = self._flights
+        if flights is None or method != "GET":
+            return self._request(method, uri, params_prefix, params, probe=probe)
+
+        key = uri, tuple(_prepare_params(params, params_prefix))
+        with self._flights_lock:
+            flight = flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = flights[key] = _Flight()
+        if not leader:
+            response = flight.wait()
+            if response is None:
+                # the request was interrupted, ex. by KeyboardInterrupt
+                return self._request(method, uri, params_prefix, params, probe=probe)
+            if probe is not None:
+                probe.cached = True
+                probe.status = response.status_code
+                probe.bytes_in = 0
+            return response
+
+        try:
+            flight.response = self._request(method, uri, params_prefix, params, probe=probe)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                if flights.get(key) is flight:
+                    del flights[key]
+            flight.done.set()
+        return flight.response
+
+    def _request(self, method, uri, params_prefix, params, stream=False, probe=None):
+        params = _prepare_params(params, params_prefix)
+        headers = {"User-Agent": self.user_agent}
+
+        store = self._store
+        if store is not None and method == "GET":
+            body = store.get(uri, params)
+            if body is not None:
+                if probe is not None:
+                    probe.cached = True
+                    probe.status = 200
+                    probe.bytes_in = 0
+                return _bytes_response(body)
+
+        cache, entry = self._cache, None
+        cacheable = cache is not None and method == "GET" and not stream
+        if cacheable:
+            key = cache.key(uri, params)
+            entry = cache.get(key)
+            if entry is not None:
+                if cache.is_fresh(entry):
+                    if probe is not None:
+                        probe.cached = True
+                        probe.status = entry.response.status_code
+                        probe.bytes_in = 0
+                    return entry.response
+                headers.update(entry.validators())
+
+        if method == "POST" or method == "PUT":
+            r_data = {"data": params}
+        else:
+            r_data = {"params": params}
+
+        # build the HTTP request and use basic authentication
+        url = "https://%s/%s.json" % (CHALLONGE_API_URL, uri)
+
+        try:
+            response = self._send(method, url, headers, stream, r_data, probe)
+            if probe is not None:
+                probe.status = response.status_code
+                if "data" in r_data:
+                    from requests.compat import urlencode
+
+                    probe.bytes_out = len(urlencode([(k, v) for k, v in params if v is not None]))
+                if not stream:
+                    probe.bytes_in = len(response.content)
+            if response.status_code == 422:
+                # wrap up application-level errors
+                doc = _decode(response)
+                if doc.get("errors"):
+                    raise ChallongeException(*doc["errors"])
+            else:
+                response.raise_for_status()
+        finally:
+            if cache is not None and method != "GET":
+                cache.invalidate(uri)
+            if store is not None and method != "GET":
+                store.invalidate(uri)
+
+        if store is not None and method == "GET" and not stream and response.status_code == 200:
+            store.offer(uri, params, response.content)
+
+        if cacheable:
+            if response.status_code == 304 and entry is not None:
+                cache.refresh(key)
+                if probe is not None:
+                    probe.cached = True
+                return entry.response
+            elif response.status_code == 200:
+                cache.put(key, response)
+
+        return response
+
+    def _send(self, method, url, headers, stream, r_data, probe=None):
+        """Send a request through the rate limiter, retrying it by the retry policy."""
+        import requests
+
+        limiter, policy = self._rate_limiter, self._retry_policy
+        started = time.time()
+        retries = 0
+        while True:
+            if limiter is not None:
+                waited = limiter.acquire()
+                if probe is not None:
+                    probe.wait += waited
+            try:
+                sent = time.time()
+                response = self.get_pool().request(
+                    method,
+                    url,
+                    headers=headers,
+                    auth=self.get_credentials(),
+                    stream=stream,
+                    **r_data
+                )
+                if probe is not None:
+                    probe.retries = retries
+                    probe.server = response.elapsed.total_seconds()
+                    if not stream:
+                        probe.download = max(0.0, time.time() - sent - probe.server)
+            except (requests.ConnectionError, requests.Timeout):
+                if policy is None:
+                    raise
+                wait = policy.next_wait(method, None, retries, started)
+                if wait is None:
+                    raise
+            else:
+                status = response.status_code
+                if status != 429 and status < 500:
+                    return response
+                retry_after = throttle.retry_after(response)
+                wait = None
+                if policy is not None:
+                    wait = policy.next_wait(method, status, retries, started, retry_after)
+                if status == 429 and limiter is not None:
+                    # slow down every thread, not just this one
+                    limiter.pause(wait if wait is not None else retry_after or 0)
+                if wait is None:
+                    return response
+                response.close()
+
+            time.sleep(wait)
+            retries += 1
+            if probe is not None:
+                probe.wait += wait
+
+    def _seed_cache(self, uri, data, **params):
+        """Cache data as the response of a GET request to uri, if caching is enabled.
+
+        The seeded response has no validators, so it is served only for
+        the ttl of the cache.
+        """
+        cache = self._cache
+        if cache is not None and cache.ttl > 0:
+            key = cache.key(uri, _prepare_params(params))
+            cache.put(key, _json_response(data))
+
+    def _parse(self, data):
+        """Recursively convert a json into python data types"""
+
+        if not data:
+            return []
+        elif isinstance(data, (tuple, list)):
+            return [self._parse(subdata) for subdata in data]
+
+        record_type = self.record_type
+        if record_type != "dict" and len(data) == 1:
+            [(resource, fields)] = data.items()
+            if record_type == "lazy":
+                return LazyRecord(resource, fields, self._convert_field)
+            elif resource in RECORD_CLASSES:
+                types = schema.FIELDS.get(resource, {})
+                return RECORD_CLASSES[resource].from_json(fields, self._convert, types)
+
+        # extract the nested dict. ex. {"tournament": {"url": "7k1safq" ...}}
+        d = {}
+        for resource, fields in data.items():
+            d.update(self._parse_fields(resource, fields))
+
+        return d
+
+    def _parse_fields(self, resource, fields):
+        """Convert the string values of a record according to its schema."""
+        types = schema.FIELDS.get(resource, {})
+        d = dict(fields)
+        for k, v in fields.items():
+            if isinstance(v, TEXT_TYPE):
+                d[k] = self._convert(types, k, v)
+
+        return d
+
+    def _convert_field(self, resource, key, value):
+        """Convert a single value of a record according to its schema."""
+        if not isinstance(value, TEXT_TYPE):
+            return value
+        return self._convert(schema.FIELDS.get(resource, {}), key, value)
+
+    def _convert(self, types, key, value):
+        field_type = types.get(key, _UNKNOWN)
+        if field_type is schema.RAW:
+            return value
+        elif field_type == schema.DATETIME:
+            return self._parse_datetime(value)
+        elif field_type == schema.FLOAT:
+            return _parse_float(value)
+        return self._guess_type(key, value)
+
+    def _parse_datetime(self, value):
+        if self.datetime_type == "iso":
+            return value
+        dt = _read_datetime(value)
+        if dt is None:
+            return value
+        return self._from_datetime(dt)
+
+    def _from_datetime(self, dt):
+        """Convert an aware datetime to the datetime type."""
+        if self.datetime_type == "local":
+            return dt.astimezone(self.tz or self.get_timezone())
+        elif self.datetime_type == "utc":
+            return dt.astimezone(_UTC)
+        return (dt - _EPOCH).total_seconds()
+
+    def _guess_type(self, key, value):
+        """Convert a string of a field missing from the schema.
+
+        Datetime strings are converted to datetime objects
+        and float number strings to float.
+        """
+        if key in _TEXT_FIELDS:
+            return value
+        if self.datetime_type != "iso":
+            dt = _read_datetime(value)
+            if dt is not None:
+                return self._from_datetime(dt)
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+class _Flight(object):
+    """A GET request in flight, whose outcome is shared by the identical requests."""
+
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+    def wait(self):
+        """Wait for the request and return its response or raise its exception.
+
+        None is returned if the request was interrupted without a response.
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+class _Probe(object):
+    """The measures of a request, reported to the hooks on exit."""
+
+    def __init__(self, method, uri, hooks):
+        self.method = method
+        self.uri = uri
+        self.hooks = hooks
+        self.status = None
+        self.bytes_out = 0
+        self.bytes_in = None
+        self.retries = 0
+        self.cached = False
+        self.wait = self.server = self.download = self.parse = 0.0
+
+    def __enter__(self):
+        self.started = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        error = exc_value if exc_type is not None and issubclass(exc_type, Exception) else None
+        event = metrics.RequestEvent(
+            self.method,
+            self.uri,
+            metrics.endpoint(self.uri),
+            self.status,
+            self.bytes_out,
+            self.bytes_in,
+            self.retries,
+            self.cached,
+            self.wait,
+            self.server,
+            self.download,
+            self.parse,
+            time.time() - self.started,
+            error,
         )
-        response.raise_for_status()
-    except HTTPError:
-        if response.status_code != 422:
-            response.raise_for_status()
-        # wrap up application-level errors
-        doc = response.json()
-        if doc.get("errors"):
-            raise ChallongeException(*doc["errors"])
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                import logging
+
+                logging.getLogger(__name__).exception("request hook %r failed", hook)
+
+    def read(self, chunks):
+        """Count the bytes and the time spent reading chunks of a streamed body."""
+        self.bytes_in = 0
+        chunks = iter(chunks)
+        while True:
+            started = time.time()
+            chunk = next(chunks, None)
+            self.download += time.time() - started
+            if chunk is None:
+                return
+            self.bytes_in += len(chunk)
+            yield chunk
+
+
+def _decode(response):
+    """Decode the json body of a response."""
+    return _loads(response.content)
+
+
+def _loads(data):
+    """Decode a json document from bytes with the json backend.
+
+    The bytes are decoded as they are instead of as response.text,
+    which would look for their charset and copy them to a string first.
+    """
+    if _json_loads is None:
+        set_json_backend(json_backend)
+    return _json_loads(data)
+
 
+def _json_response(data):
+    return _bytes_response(json.dumps(data).encode("utf-8"))
+
+
+def _bytes_response(body):
+    import requests
+
+    response = requests.models.Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json; charset=utf-8"
+    response._content = body
+    response._content_consumed = True
     return response
 
 
-def fetch_and_parse(method, uri, params_prefix=None, **params):
-    """Fetch the given uri and return python dictionary with parsed data-types."""
-    response = fetch(method, uri, params_prefix, **params)
-    return _parse(json.loads(response.text))
-
-
-def _parse(data):
-    """Recursively convert a json into python data types"""
-
-    if not data:
-        return []
-    elif isinstance(data, (tuple, list)):
-        return [_parse(subdata) for subdata in data]
-
-    # extract the nested dict. ex. {"tournament": {"url": "7k1safq" ...}}
-    d = {ik: v for k in data.keys() for ik, v in data[k].items()}
-
-    # convert datetime strings to datetime objects
-    # and float number strings to float
-    to_parse = dict(d)
-    for k, v in to_parse.items():
-        if k in {
-            "name",
-            "display_name",
-            "display_name_with_invitation_email_address",
-            "username",
-            "challonge_username",
-            "misc",
-        }:
-            continue  # do not test type of fields which are always strings
-        if isinstance(v, TEXT_TYPE):
+_SEPARATORS = re.compile(r"[\s,]*")
+# the characters which can follow an element of a json array
+_ELEMENT_ENDS = frozenset(" \t\r\n,]")
+
+
+def _iter_json(chunks):
+    """Decode a json document from an iterable of byte chunks.
+
+    If the document is an array its elements are yielded as soon as
+    they have been read, otherwise the whole document is yielded once.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    in_array = None
+    for chunk in chunks:
+        buf = buf[pos:] + text_decoder.decode(chunk)
+        pos = _SEPARATORS.match(buf).end()
+        if in_array is None and pos < len(buf):
+            in_array = buf[pos] == "["
+            if in_array:
+                pos = _SEPARATORS.match(buf, pos + 1).end()
+        if not in_array:
+            continue
+
+        while pos < len(buf):
+            if buf[pos] == "]":
+                return
             try:
-                dt = iso8601.parse_date(v)
-                d[k] = dt.astimezone(tz)
-            except iso8601.ParseError:
-                try:
-                    d[k] = float(v)
-                except ValueError:
-                    pass
+                data, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                break  # the element continues in the next chunk
+            if end == len(buf) or buf[end] not in _ELEMENT_ENDS:
+                break  # a number cut by the chunk, ex. "12" of 123 or "1." of 1.5
+            yield data
+            pos = _SEPARATORS.match(buf, end).end()
+
+    buf = buf[pos:] + text_decoder.decode(b"", final=True)
+    if in_array:
+        raise ValueError("Unterminated json array")
+    elif buf.strip():
+        yield json.loads(buf)
+
+
+_UNKNOWN = object()
 
-    return d
+# fields which are always strings, even if they look like something else
+_TEXT_FIELDS = frozenset(
+    (
+        "name",
+        "display_name",
+        "display_name_with_invitation_email_address",
+        "username",
+        "challonge_username",
+        "misc",
+    )
+)
+
+
+class _UTCZone(datetime.tzinfo):
+    """The UTC timezone, for Python 2 which has no datetime.timezone."""
+
+    def utcoffset(self, dt):
+        return datetime.timedelta(0)
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, dt):
+        return "UTC"
+
+    def __repr__(self):
+        return "<UTC>"
+
+
+try:
+    _UTC = datetime.timezone.utc
+    _fromisoformat = getattr(datetime.datetime, "fromisoformat", None)  # Python 3.7+
+except AttributeError:  # Python 2
+    _UTC = _UTCZone()
+    _fromisoformat = None
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=_UTC)
+
+
+def _read_datetime(value):
+    """Read an ISO 8601 string as an aware datetime, or return None if it is not one."""
+    if _fromisoformat is not None:
+        # much faster than iso8601 and reads the strings of challonge.com
+        try:
+            dt = _fromisoformat(value)
+        except ValueError:
+            dt = None
+        if dt is not None and dt.tzinfo is not None:
+            return dt
+    import iso8601
+
+    try:
+        return iso8601.parse_date(value)
+    except iso8601.ParseError:
+        return None
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return value
 
 
 def _prepare_params(dirty_params, prefix=None):
@@ -192,3 +1146,58 @@ def _prepare_value(val):
         # challonge.com only accepts lowercase true/false
         val = str(val).lower()
     return val
+
+
+# the client of the module level functions
+_default = Challonge()
+_credentials = _default._credentials
+
+
+def get_client():
+    """Return the default client, used by the module level functions."""
+    return _default
+
+
+set_credentials = _default.set_credentials
+get_credentials = _default.get_credentials
+set_user_agent = _default.set_user_agent
+get_user_agent = _default.get_user_agent
+set_timezone = _default.set_timezone
+get_timezone = _default.get_timezone
+set_record_type = _default.set_record_type
+get_record_type = _default.get_record_type
+set_datetime_type = _default.set_datetime_type
+get_datetime_type = _default.get_datetime_type
+get_cache = _default.get_cache
+set_cache = _default.set_cache
+configure_cache = _default.configure_cache
+get_store = _default.get_store
+set_store = _default.set_store
+configure_store = _default.configure_store
+set_rate_limiter = _default.set_rate_limiter
+configure_rate_limit = _default.configure_rate_limit
+set_retry_policy = _default.set_retry_policy
+configure_retries = _default.configure_retries
+get_pool = _default.get_pool
+set_pool = _default.set_pool
+configure_pool = _default.configure_pool
+close_pool = _default.close_pool
+add_hook = _default.add_hook
+remove_hook = _default.remove_hook
+set_coalescing = _default.set_coalescing
+get_coalescing = _default.get_coalescing
+fetch = _default.fetch
+fetch_and_parse = _default.fetch_and_parse
+fetch_and_iter = _default.fetch_and_iter
+_parse = _default._parse
+_seed_cache = _default._seed_cache
+
+
+def __getattr__(name):
+    # tz and user_agent were module attributes before the clients were
+    # added, they are read from the default client (Python 3.7+)
+    if name == "tz":
+        return _default.get_timezone()
+    if name == "user_agent":
+        return _default.user_agent
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
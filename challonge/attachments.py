@@ -1,40 +1,56 @@
 from challonge import api
 
 
-def index(tournament, match):
-    """Retrieve a set of attachments created for a specific match."""
-    return api.fetch_and_parse("GET", "tournaments/%s/matches/%s/attachments" % (tournament, match))
-
-
-def create(tournament, match, **params):
-    """Create a new attachment for the specific match."""
-    return api.fetch_and_parse(
-        "POST",
-        "tournaments/%s/matches/%s/attachments" % (tournament, match),
-        "match_attachment",
-        **params
-    )
-
-
-def show(tournament, match, attachment):
-    """Retrieve a single match attachment record."""
-    return api.fetch_and_parse(
-        "GET", "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment)
-    )
-
-
-def update(tournament, match, attachment, **params):
-    """Update the attributes of a match attachment."""
-    api.fetch(
-        "PUT",
-        "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment),
-        "match_attachment",
-        **params
-    )
-
-
-def destroy(tournament, match, attachment):
-    """Delete a match attachment."""
-    api.fetch(
-        "DELETE", "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment)
-    )
+class Attachments(object):
+    """The match attachments operations of a challonge.api.Challonge client.
+
+    The functions of this module are the operations of the default client.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def index(self, tournament, match):
+        """Retrieve a set of attachments created for a specific match."""
+        return self._client.fetch_and_parse(
+            "GET", "tournaments/%s/matches/%s/attachments" % (tournament, match)
+        )
+
+    def create(self, tournament, match, **params):
+        """Create a new attachment for the specific match."""
+        return self._client.fetch_and_parse(
+            "POST",
+            "tournaments/%s/matches/%s/attachments" % (tournament, match),
+            "match_attachment",
+            **params
+        )
+
+    def show(self, tournament, match, attachment):
+        """Retrieve a single match attachment record."""
+        return self._client.fetch_and_parse(
+            "GET", "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment)
+        )
+
+    def update(self, tournament, match, attachment, **params):
+        """Update the attributes of a match attachment."""
+        self._client.fetch(
+            "PUT",
+            "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment),
+            "match_attachment",
+            **params
+        )
+
+    def destroy(self, tournament, match, attachment):
+        """Delete a match attachment."""
+        self._client.fetch(
+            "DELETE", "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment)
+        )
+
+
+_default = api.get_client().attachments
+
+index = _default.index
+create = _default.create
+show = _default.show
+update = _default.update
+destroy = _default.destroy
@@ -0,0 +1,53 @@
+"""Run many API calls concurrently on a bounded pool of threads."""
+DEFAULT_MAX_WORKERS = 8
+
+
+class BatchResult(dict):
+    """The results of a batch of calls, keyed by the item of each call.
+
+    The items whose call raised an exception are not in the dictionary,
+    their exceptions are in the `errors` dictionary instead, keyed the
+    same way.
+    """
+
+    def __init__(self):
+        super(BatchResult, self).__init__()
+        self.errors = {}
+
+    @property
+    def ok(self):
+        """True if none of the calls failed."""
+        return not self.errors
+
+
+def run_many(func, items, max_workers=None):
+    """Call func(item) for every item using at most max_workers threads.
+
+    An exception raised by one of the calls does not stop the others.
+
+    :param func: a callable taking one item
+    :param items: hashable items, ex. tournament ids or urls
+    :param max_workers: the maximum number of simultaneous calls.
+        Defaults to DEFAULT_MAX_WORKERS. Keep it at or below the
+        connection pool size to reuse the pooled connections
+
+    :return
+        a BatchResult
+    """
+    items = list(items)
+    results = BatchResult()
+    if not items:
+        return results
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = min(max_workers or DEFAULT_MAX_WORKERS, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(item, executor.submit(func, item)) for item in items]
+        for item, future in futures:
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                results.errors[item] = e
+
+    return results
@@ -0,0 +1,143 @@
+"""An in-memory index of the matches of a tournament."""
+from collections import defaultdict
+
+
+class BracketIndex(object):
+    """Index the matches of a tournament for constant time lookups.
+
+    Build it from the output of matches.index() and keep it current
+    with update() as single matches change, ex. with the result of
+    matches.show(). The matches can be dictionaries or any of the
+    record types of challonge.records.
+
+    The lookups returning several matches return them in no
+    particular order. The index is not thread-safe.
+
+    :param matches: the matches of one tournament
+    """
+
+    def __init__(self, matches=()):
+        self._matches = {}
+        self._by_participant = defaultdict(set)
+        self._by_state = defaultdict(set)
+        self._by_round = defaultdict(set)
+        self._by_identifier = {}
+        # prerequisite match id -> ids of the matches waiting on it
+        self._dependents = defaultdict(set)
+        for match in matches:
+            self.update(match)
+
+    def __len__(self):
+        return len(self._matches)
+
+    def __iter__(self):
+        return iter(self._matches.values())
+
+    def __contains__(self, match_id):
+        return match_id in self._matches
+
+    def __getitem__(self, match_id):
+        return self._matches[match_id]
+
+    def get(self, match_id, default=None):
+        """Return the match with the given id or default."""
+        return self._matches.get(match_id, default)
+
+    def update(self, match):
+        """Add a match to the index or replace the indexed match with the same id."""
+        match_id = match["id"]
+        if match_id in self._matches:
+            self.remove(match_id)
+
+        self._matches[match_id] = match
+        for participant_id in _players(match):
+            self._by_participant[participant_id].add(match_id)
+        self._by_state[match.get("state")].add(match_id)
+        self._by_round[match.get("round")].add(match_id)
+        if match.get("identifier") is not None:
+            self._by_identifier[match["identifier"]] = match_id
+        for prereq_id in _prereqs(match):
+            self._dependents[prereq_id].add(match_id)
+
+    def remove(self, match_id):
+        """Remove a match from the index."""
+        match = self._matches.pop(match_id)
+        for participant_id in _players(match):
+            _discard(self._by_participant, participant_id, match_id)
+        _discard(self._by_state, match.get("state"), match_id)
+        _discard(self._by_round, match.get("round"), match_id)
+        if self._by_identifier.get(match.get("identifier")) == match_id:
+            del self._by_identifier[match["identifier"]]
+        for prereq_id in _prereqs(match):
+            _discard(self._dependents, prereq_id, match_id)
+
+    def by_identifier(self, identifier):
+        """Return the match with the given identifier (ex. "A") or None."""
+        match_id = self._by_identifier.get(identifier)
+        return self._matches.get(match_id) if match_id is not None else None
+
+    def matches_of(self, participant_id):
+        """Return the matches a participant plays in."""
+        return self._get(self._by_participant.get(participant_id, ()))
+
+    def matches_in_state(self, state):
+        """Return the matches in a state, ex. "open", "pending" or "complete"."""
+        return self._get(self._by_state.get(state, ()))
+
+    def open_matches(self):
+        """Return the matches which can be played now."""
+        return self.matches_in_state("open")
+
+    def matches_in_round(self, round):
+        """Return the matches of a round. Losers bracket rounds are negative."""
+        return self._get(self._by_round.get(round, ()))
+
+    def waiting_on(self, match_id):
+        """Return the matches which take a player from the given match."""
+        return self._get(self._dependents.get(match_id, ()))
+
+    def advances_to(self, match_id, loser=False):
+        """Return the match the winner (or the loser) of a match plays next or None."""
+        for match in self.waiting_on(match_id):
+            for n in ("1", "2"):
+                if match.get("player%s_prereq_match_id" % n) == match_id and bool(
+                    match.get("player%s_is_prereq_match_loser" % n)
+                ) == bool(loser):
+                    return match
+        return None
+
+    def next_match(self, participant_id):
+        """Return the next match of a participant or None.
+
+        Open matches come before pending ones. A participant whose next
+        opponent is not known yet may not have a pending match.
+        """
+        best = None
+        for match in self.matches_of(participant_id):
+            state = match.get("state")
+            if state not in ("open", "pending"):
+                continue
+            key = (state != "open", match.get("suggested_play_order") or 0, match["id"])
+            if best is None or key < best[0]:
+                best = key, match
+        return best[1] if best is not None else None
+
+    def _get(self, match_ids):
+        return [self._matches[match_id] for match_id in match_ids]
+
+
+def _players(match):
+    return set(p for p in (match.get("player1_id"), match.get("player2_id")) if p is not None)
+
+
+def _prereqs(match):
+    ids = (match.get("player1_prereq_match_id"), match.get("player2_prereq_match_id"))
+    return set(i for i in ids if i is not None)
+
+
+def _discard(index, key, match_id):
+    match_ids = index.get(key)
+    if match_ids is not None:
+        match_ids.discard(match_id)
+        if not match_ids:
+            del index[key]
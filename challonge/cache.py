@@ -0,0 +1,165 @@
+"""An in-memory cache of the responses of GET requests."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Entry(object):
+    __slots__ = ("response", "tournament", "stored_at")
+
+    def __init__(self, response, tournament):
+        self.response = response
+        self.tournament = tournament
+        self.stored_at = time.time()
+
+    def validators(self):
+        """Return the headers revalidating the cached response."""
+        headers = {}
+        etag = self.response.headers.get("ETag")
+        if etag:
+            headers["If-None-Match"] = etag
+        last_modified = self.response.headers.get("Last-Modified")
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """A bounded LRU cache of the responses of GET requests.
+
+    A response younger than `ttl` seconds is served from memory without
+    contacting challonge.com. An older one is revalidated with the
+    If-None-Match and If-Modified-Since headers, so the body is not
+    downloaded again if it has not changed (304 Not Modified).
+
+    Any PUT, POST or DELETE request made through the library drops the
+    cached responses of the tournament it changes and of the tournament
+    lists. The id, url and "subdomain-url" identifiers of a tournament
+    are learned from the tournament records passed to learn(), so a
+    change made with one of them drops the responses cached for the
+    others. Responses cached for an identifier which is not known yet
+    are dropped by any change to a tournament.
+
+    :keyword param maxsize: the maximum number of cached responses
+    :keyword param ttl: seconds a response is served without being
+        revalidated. 0 revalidates every time
+    """
+
+    def __init__(self, maxsize=256, ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._aliases = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(uri, params):
+        """Return the cache key of a request."""
+        return uri, tuple(params)
+
+    def get(self, key):
+        """Return the entry stored for key or None.
+
+        Stale entries without validators are dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self.is_fresh(entry) and not entry.validators():
+                del self._entries[key]
+                return None
+            self._entries.pop(key)
+            self._entries[key] = entry
+            return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at < self.ttl
+
+    def put(self, key, response):
+        """Store the response of a request."""
+        entry = _Entry(response, _tournament(key[0]))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key):
+        """Mark the entry stored for key as just validated."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.time()
+
+    def learn(self, uri, data):
+        """Learn the identifiers of the tournaments of a decoded GET response.
+
+        :param uri: the uri of the request, ex. "tournaments" or "tournaments/my_tourney"
+        :param data: its decoded response
+        """
+        parts = uri.split("/")
+        if parts[0] != "tournaments" or len(parts) > 2:
+            return
+        if len(parts) == 1:
+            learned = [(None, (wrapped or {}).get("tournament")) for wrapped in data or []]
+        else:
+            learned = [(parts[1], (data or {}).get("tournament"))]
+        with self._lock:
+            for identifier, fields in learned:
+                if fields and fields.get("id") is not None:
+                    tournament_id = str(fields["id"])
+                    for i in _identifiers(identifier, fields):
+                        self._aliases.pop(i, None)
+                        self._aliases[i] = tournament_id
+            # remember a few identifiers per cached response at most
+            while len(self._aliases) > 4 * self.maxsize:
+                self._aliases.popitem(last=False)
+
+    def invalidate(self, uri):
+        """Drop the responses affected by a change request to uri."""
+        tournament = _tournament(uri)
+        with self._lock:
+            tournament_id = self._aliases.get(tournament)
+            for key, entry in list(self._entries.items()):
+                if entry.tournament is not None and tournament_id is not None:
+                    other_id = self._aliases.get(entry.tournament)
+                    if other_id is not None and other_id != tournament_id:
+                        continue
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all the cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+
+
+def _tournament(uri):
+    """Return the tournament of a uri or None for the tournament lists.
+
+    ex. "tournaments/my_tourney/matches/1" -> "my_tourney"
+    """
+    parts = uri.split("/")
+    if len(parts) > 1 and parts[0] == "tournaments":
+        return parts[1]
+    return None
+
+
+def _identifiers(identifier, fields):
+    """Return the identifiers of a tournament record.
+
+    :param identifier: the identifier the record was requested with or None
+    :param fields: the fields of the record
+    """
+    identifiers = set([str(fields["id"])])
+    if identifier is not None:
+        identifiers.add(str(identifier))
+    if fields.get("url"):
+        identifiers.add(fields["url"])
+        if fields.get("subdomain"):
+            identifiers.add("%s-%s" % (fields["subdomain"], fields["url"]))
+    return identifiers
@@ -0,0 +1,183 @@
+"""Columnar tables of matches and participants for analytics.
+
+A Columns table keeps every field in an array.array, one item per
+record, instead of a dictionary per record. The columns are filled
+straight from the decoded json, without parsing the records, and take
+a fraction of the memory of the dictionaries:
+
+    table = challonge.matches.columns(tournament, state="complete")
+    table["winner_id"]   # array('q', [...])
+    table.to_numpy()     # numpy arrays, if numpy is installed
+
+Missing values are MISSING in the integer columns, the smallest value
+of the column type, -1 in the boolean columns and NaN in the float
+columns. Datetimes are float seconds since 1970-01-01 UTC.
+"""
+import array
+
+from challonge import api
+
+try:
+    array.array("q")
+    INT = "q"
+except ValueError:  # Python 2
+    INT = "l"
+FLOAT = "d"
+BOOL = "b"
+
+# no real value can take it, unlike -1 for the negative rounds of the losers bracket
+MISSING = -(2 ** (8 * array.array(INT).itemsize - 1))
+MISSING_BOOL = -1
+NAN = float("nan")
+
+
+def _int(value):
+    return MISSING if value is None else int(value)
+
+
+def _bool(value):
+    return MISSING_BOOL if value is None else int(bool(value))
+
+
+def _epoch(value):
+    if value is None:
+        return NAN
+    dt = api._read_datetime(value)
+    return NAN if dt is None else (dt - api._EPOCH).total_seconds()
+
+
+def _scores(value):
+    """Return the total scores of player 1 and player 2 of a scores_csv, ex. "3-1,2-3"."""
+    if not value:
+        return MISSING, MISSING
+    score1 = score2 = 0
+    for game in value.split(","):
+        game = game.strip()
+        # a score can be negative, ex. "-1-3"
+        head, sep, tail = game[1:].partition("-")
+        try:
+            score1 += int(game[:1] + head)
+            score2 += int(tail)
+        except ValueError:
+            return MISSING, MISSING
+    return score1, score2
+
+
+# the columns of each resource: (name, typecode, field, convert)
+MATCH = (
+    ("id", INT, "id", _int),
+    ("tournament_id", INT, "tournament_id", _int),
+    ("round", INT, "round", _int),
+    ("player1_id", INT, "player1_id", _int),
+    ("player2_id", INT, "player2_id", _int),
+    ("winner_id", INT, "winner_id", _int),
+    ("loser_id", INT, "loser_id", _int),
+    ("started_at", FLOAT, "started_at", _epoch),
+    ("completed_at", FLOAT, "completed_at", _epoch),
+    ("updated_at", FLOAT, "updated_at", _epoch),
+)
+PARTICIPANT = (
+    ("id", INT, "id", _int),
+    ("tournament_id", INT, "tournament_id", _int),
+    ("seed", INT, "seed", _int),
+    ("final_rank", INT, "final_rank", _int),
+    ("active", BOOL, "active", _bool),
+    ("checked_in_at", FLOAT, "checked_in_at", _epoch),
+    ("created_at", FLOAT, "created_at", _epoch),
+    ("updated_at", FLOAT, "updated_at", _epoch),
+)
+COLUMNS = {"match": MATCH, "participant": PARTICIPANT}
+
+
+class Columns(object):
+    """A table of records stored by column.
+
+    The columns are array.array objects of the same length. They can be
+    read by name, ex. table["winner_id"], and the table iterates over
+    the column names like a dictionary. Match tables also have the
+    player1_score and player2_score columns, the total of the scores
+    of every set in scores_csv.
+
+    Tables of many tournaments can be joined with extend().
+
+    :param resource: "match" or "participant"
+    """
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.columns = dict(
+            (name, array.array(typecode)) for name, typecode, _, _ in COLUMNS[resource]
+        )
+        if resource == "match":
+            self.columns["player1_score"] = array.array(INT)
+            self.columns["player2_score"] = array.array(INT)
+
+    @classmethod
+    def from_json(cls, resource, data):
+        """Build a table from decoded json records, ex. [{"match": {...}}, ...]."""
+        table = cls(resource)
+        table.extend_json(data)
+        return table
+
+    def extend_json(self, data):
+        """Append decoded json records to the table.
+
+        Each record is converted before any of its values is appended,
+        so a record which cannot be converted leaves the table unchanged.
+        """
+        resource = self.resource
+        spec = COLUMNS[resource]
+        appends = [self.columns[name].append for name, _, _, _ in spec]
+        match = resource == "match"
+        if match:
+            appends.append(self.columns["player1_score"].append)
+            appends.append(self.columns["player2_score"].append)
+        for wrapped in data:
+            fields = wrapped[resource]
+            row = [convert(fields.get(field)) for _, _, field, convert in spec]
+            if match:
+                row.extend(_scores(fields.get("scores_csv")))
+            for append, value in zip(appends, row):
+                append(value)
+
+    def extend(self, other):
+        """Append the rows of another table of the same resource."""
+        if other.resource != self.resource:
+            raise ValueError("cannot join %s and %s columns" % (self.resource, other.resource))
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def row(self, index):
+        """Return the row at the given index as a dict."""
+        return dict((name, column[index]) for name, column in self.columns.items())
+
+    def nbytes(self):
+        """Return the memory used by the values of the columns."""
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+    def to_numpy(self):
+        """Return the columns as numpy arrays sharing the memory of the columns."""
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError(
+                "Columns.to_numpy() requires numpy. Install it with: pip install numpy"
+            )
+        return dict(
+            (name, numpy.frombuffer(column, dtype=column.typecode))
+            for name, column in self.columns.items()
+        )
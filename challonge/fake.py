@@ -0,0 +1,812 @@
+"""An in-process stand-in for the Challonge API, for tests and load tests.
+
+FakeChallonge answers the requests of challonge.api from memory. It has
+the interface of api.ConnectionPool, so it plugs in under api.fetch()::
+
+    from challonge import api, fake
+
+    api.set_pool(fake.FakeChallonge(latency=0.05, error_rate=0.01))
+    t = challonge.tournaments.create("Load test", "load_test_1")
+
+It implements the endpoints used by the tournaments, matches,
+participants and attachments modules with their main state transitions:
+check-ins, start, score reporting with advancement of the winners,
+reopening matches, finalize and reset. Started tournaments get a single
+elimination bracket, or a round robin for "round robin" tournaments.
+Its responses can be delayed and errors can be injected.
+"""
+import datetime
+import itertools
+import json
+import random
+import threading
+import time
+
+import requests
+
+try:
+    from http.client import responses
+except ImportError:  # Python 2
+    from httplib import responses
+
+# the tournament states which count as "in_progress" in the index filter
+_IN_PROGRESS = ("checking_in", "checked_in", "underway", "awaiting_review")
+# the states in which participants can still be changed freely
+_NOT_STARTED = ("pending", "checking_in", "checked_in", "accepting_predictions")
+# fields which always keep the values they were sent with
+_TEXT_FIELDS = frozenset(
+    ("name", "url", "description", "misc", "scores_csv", "email", "username", "location")
+)
+
+
+class _Error(Exception):
+    def __init__(self, status, *messages):
+        super(_Error, self).__init__(status, *messages)
+        self.status = status
+        self.messages = messages
+        self.retry_after = None
+
+
+class FakeChallonge(object):
+    """An in-memory Challonge backend with the interface of api.ConnectionPool.
+
+    :keyword param latency: the seconds every response is delayed
+    :keyword param jitter: extra random delay of up to these seconds
+    :keyword param error_rate: the probability of answering a request
+        with one of the error_statuses instead of processing it
+    :keyword param error_statuses: the status codes of injected errors
+    :keyword param rate_limit: the requests per second answered before
+        responding with 429 Too Many Requests and a Retry-After header.
+        None for no limit
+    :keyword param seed: the seed of the random generator, for
+        reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_statuses=(500, 503),
+        rate_limit=None,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rate_limit = rate_limit
+        self.request_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._window = (0, 0)
+        self._tournaments = {}
+        self._participants = {}
+        self._matches = {}
+        self._attachments = {}
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        """Answer a request of challonge.api with a requests.Response."""
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        path = url.split("/v1/", 1)[-1]
+        if path.endswith(".json"):
+            path = path[: -len(".json")]
+        pairs = list(params or []) + list(data or [])
+
+        retry_after = None
+        with self._lock:
+            self.request_count += 1
+            try:
+                self._check_limits()
+                status, body = 200, self._route(method, path.split("/"), pairs)
+            except _Error as e:
+                status, body, retry_after = e.status, {"errors": list(e.messages)}, e.retry_after
+
+        return _response(status, body, url, retry_after)
+
+    def close(self):
+        pass
+
+    def _check_limits(self):
+        if self.rate_limit is not None:
+            second = int(time.time())
+            start, count = self._window
+            count = count + 1 if start == second else 1
+            self._window = second, count
+            if count > self.rate_limit:
+                error = _Error(429, "Rate limit exceeded")
+                error.retry_after = 1
+                raise error
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise _Error(self._random.choice(self.error_statuses), "Injected error")
+
+    # routing
+
+    def _route(self, method, parts, pairs):
+        if parts[0] != "tournaments":
+            raise _Error(404, "Not found")
+        if len(parts) == 1:
+            if method == "GET":
+                return self._index_tournaments(_flat(pairs))
+            elif method == "POST":
+                return self._create_tournament(_fields(pairs, "tournament"))
+            raise _Error(405, "Method not allowed")
+
+        t = self._tournament(parts[1])
+        rest = parts[2:]
+        if not rest:
+            if method == "GET":
+                return self._show_tournament(t, _flat(pairs))
+            elif method == "PUT":
+                return self._update_tournament(t, _fields(pairs, "tournament"))
+            elif method == "DELETE":
+                return self._destroy_tournament(t)
+        elif len(rest) == 1 and method == "POST" and rest[0] in _TOURNAMENT_ACTIONS:
+            return getattr(self, "_" + rest[0])(t)
+        elif rest[0] == "participants":
+            return self._route_participants(method, t, rest[1:], pairs)
+        elif rest[0] == "matches":
+            return self._route_matches(method, t, rest[1:], pairs)
+        raise _Error(404, "Not found")
+
+    def _route_participants(self, method, t, rest, pairs):
+        if not rest:
+            if method == "GET":
+                return [_wrap("participant", p) for p in self._participants_of(t)]
+            elif method == "POST":
+                return self._create_participants(t, [_fields(pairs, "participant")])[0]
+        elif rest == ["bulk_add"] and method == "POST":
+            return self._create_participants(t, _bulk_fields(pairs, "participants[]"))
+        elif rest == ["randomize"] and method == "POST":
+            return self._randomize(t)
+        else:
+            p = self._participant(t, rest[0])
+            if len(rest) == 1:
+                if method == "GET":
+                    return _wrap("participant", p)
+                elif method == "PUT":
+                    return self._update_participant(t, p, _fields(pairs, "participant"))
+                elif method == "DELETE":
+                    return self._destroy_participant(t, p)
+            elif rest[1] in ("check_in", "undo_check_in") and method == "POST":
+                return self._check_in(t, p, rest[1] == "check_in")
+        raise _Error(404, "Not found")
+
+    def _route_matches(self, method, t, rest, pairs):
+        if not rest:
+            if method == "GET":
+                return self._index_matches(t, _flat(pairs))
+        else:
+            m = self._match(t, rest[0])
+            if len(rest) == 1:
+                if method == "GET":
+                    return _wrap("match", m)
+                elif method == "PUT":
+                    return self._update_match(t, m, _fields(pairs, "match"))
+            elif len(rest) == 2 and method == "POST" and rest[1] in _MATCH_ACTIONS:
+                return getattr(self, "_" + rest[1])(t, m)
+            elif rest[1] == "attachments":
+                return self._route_attachments(method, m, rest[2:], pairs)
+        raise _Error(404, "Not found")
+
+    def _route_attachments(self, method, m, rest, pairs):
+        attachments = self._attachments.setdefault(m["id"], {})
+        if not rest:
+            if method == "GET":
+                return [_wrap("match_attachment", a) for a in attachments.values()]
+            elif method == "POST":
+                a = self._new_attachment(m, _fields(pairs, "match_attachment"))
+                attachments[a["id"]] = a
+                return _wrap("match_attachment", a)
+        elif len(rest) == 1:
+            a = attachments.get(_int(rest[0]))
+            if a is None:
+                raise _Error(404, "Attachment not found")
+            if method == "GET":
+                return _wrap("match_attachment", a)
+            elif method == "PUT":
+                self._set_asset(a, _fields(pairs, "match_attachment"))
+                a["updated_at"] = _now()
+                return _wrap("match_attachment", a)
+            elif method == "DELETE":
+                del attachments[a["id"]]
+                m["attachment_count"] = len(attachments)
+                m["has_attachment"] = bool(attachments)
+                return _wrap("match_attachment", a)
+        raise _Error(404, "Not found")
+
+    # tournaments
+
+    def _tournament(self, key):
+        t = self._tournaments.get(_int(key))
+        if t is None:
+            for t in self._tournaments.values():
+                if t["url"] == key:
+                    break
+            else:
+                raise _Error(404, "Tournament not found")
+        return t
+
+    def _index_tournaments(self, params):
+        state = params.get("state", "all")
+        after = params.get("created_after")
+        before = params.get("created_before")
+        result = []
+        for t in self._tournaments.values():
+            if state == "pending" and t["state"] != "pending":
+                continue
+            if state == "in_progress" and t["state"] not in _IN_PROGRESS:
+                continue
+            if state == "ended" and t["state"] != "complete":
+                continue
+            if after and t["created_at"][:10] < str(after)[:10]:
+                continue
+            if before and t["created_at"][:10] > str(before)[:10]:
+                continue
+            result.append(_wrap("tournament", t))
+        return result
+
+    def _create_tournament(self, fields):
+        if not fields.get("name"):
+            raise _Error(422, "Name can't be blank")
+        url = fields.get("url") or "t%s" % self._random.getrandbits(32)
+        if any(t["url"] == url for t in self._tournaments.values()):
+            raise _Error(422, "URL is already taken")
+
+        now = _now()
+        t = {
+            "id": next(self._ids),
+            "name": fields["name"],
+            "url": url,
+            "description": "",
+            "tournament_type": "single elimination",
+            "state": "pending",
+            "private": False,
+            "open_signup": False,
+            "hold_third_place_match": False,
+            "accept_attachments": False,
+            "prediction_method": 0,
+            "progress_meter": 0,
+            "participants_count": 0,
+            "check_in_duration": None,
+            "start_at": None,
+            "started_at": None,
+            "completed_at": None,
+            "started_checking_in_at": None,
+            "created_at": now,
+            "updated_at": now,
+            "pts_for_match_win": "1.0",
+            "pts_for_match_tie": "0.5",
+            "pts_for_game_win": "0.0",
+            "pts_for_game_tie": "0.0",
+            "pts_for_bye": "1.0",
+            "full_challonge_url": "https://challonge.com/%s" % url,
+        }
+        t.update(fields)
+        self._tournaments[t["id"]] = t
+        self._participants[t["id"]] = {}
+        self._matches[t["id"]] = {}
+        return _wrap("tournament", t)
+
+    def _show_tournament(self, t, params):
+        data = dict(t)
+        if _true(params.get("include_participants")):
+            data["participants"] = [_wrap("participant", p) for p in self._participants_of(t)]
+        if _true(params.get("include_matches")):
+            data["matches"] = [_wrap("match", m) for m in self._matches_of(t)]
+        return {"tournament": data}
+
+    def _update_tournament(self, t, fields):
+        if "url" in fields and fields["url"] != t["url"]:
+            if any(o["url"] == fields["url"] for o in self._tournaments.values()):
+                raise _Error(422, "URL is already taken")
+        t.update(fields)
+        t["updated_at"] = _now()
+        return _wrap("tournament", t)
+
+    def _destroy_tournament(self, t):
+        del self._tournaments[t["id"]]
+        for m in self._matches.pop(t["id"]).values():
+            self._attachments.pop(m["id"], None)
+        del self._participants[t["id"]]
+        return _wrap("tournament", t)
+
+    def _process_check_ins(self, t):
+        if t["state"] not in ("pending", "checking_in"):
+            raise _Error(422, "Check-in is not open")
+        for p in self._participants_of(t):
+            if not p["checked_in"]:
+                p["active"] = False
+        self._reseed(t)
+        self._set_state(t, "checked_in")
+        return _wrap("tournament", t)
+
+    def _abort_check_in(self, t):
+        if t["state"] not in ("checking_in", "checked_in"):
+            raise _Error(422, "Check-in is not in progress")
+        for p in self._participants_of(t):
+            p.update(active=True, checked_in=False, checked_in_at=None)
+        self._set_state(t, "pending")
+        return _wrap("tournament", t)
+
+    def _open_for_predictions(self, t):
+        if not t.get("prediction_method"):
+            raise _Error(422, "Predictions are not enabled")
+        if t["state"] != "pending":
+            raise _Error(422, "Tournament has already started")
+        self._set_state(t, "accepting_predictions")
+        return _wrap("tournament", t)
+
+    def _start(self, t):
+        if t["state"] not in _NOT_STARTED:
+            raise _Error(422, "Tournament has already started")
+        players = [p for p in self._participants_of(t) if p["active"]]
+        if len(players) < 2:
+            raise _Error(422, "Tournaments require at least 2 participants")
+
+        players.sort(key=lambda p: p["seed"])
+        if t["tournament_type"] == "round robin":
+            self._round_robin(t, players)
+        else:
+            self._single_elimination(t, players)
+        t["started_at"] = _now()
+        self._set_state(t, "underway")
+        return _wrap("tournament", t)
+
+    def _finalize(self, t):
+        if t["state"] != "awaiting_review":
+            raise _Error(422, "All matches must be completed before finalizing")
+        self._rank(t)
+        t["completed_at"] = _now()
+        self._set_state(t, "complete")
+        return _wrap("tournament", t)
+
+    def _reset(self, t):
+        if t["state"] in _NOT_STARTED:
+            raise _Error(422, "Tournament has not started")
+        for m in self._matches[t["id"]].values():
+            self._attachments.pop(m["id"], None)
+        self._matches[t["id"]] = {}
+        for p in self._participants_of(t):
+            p["final_rank"] = None
+        t.update(started_at=None, completed_at=None, progress_meter=0)
+        self._set_state(t, "pending")
+        return _wrap("tournament", t)
+
+    def _set_state(self, t, state):
+        t["state"] = state
+        t["updated_at"] = _now()
+
+    # participants
+
+    def _participants_of(self, t):
+        return sorted(self._participants[t["id"]].values(), key=lambda p: p["seed"])
+
+    def _participant(self, t, key):
+        p = self._participants[t["id"]].get(_int(key))
+        if p is None:
+            raise _Error(404, "Participant not found")
+        return p
+
+    def _create_participants(self, t, records):
+        if t["state"] not in _NOT_STARTED:
+            raise _Error(422, "Participants cannot be added to a started tournament")
+        if any(not r.get("name") and not r.get("email") for r in records):
+            raise _Error(422, "Name can't be blank")
+
+        result = []
+        for fields in records:
+            now = _now()
+            p = {
+                "id": next(self._ids),
+                "tournament_id": t["id"],
+                "name": fields.get("name"),
+                "seed": len(self._participants[t["id"]]) + 1,
+                "active": True,
+                "misc": None,
+                "final_rank": None,
+                "checked_in": False,
+                "checked_in_at": None,
+                "invite_email": None,
+                "on_waiting_list": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            seed = fields.pop("seed", None)
+            p.update(fields)
+            self._participants[t["id"]][p["id"]] = p
+            if seed is not None:
+                self._move_seed(t, p, seed)
+            result.append(_wrap("participant", p))
+
+        t["participants_count"] = len(self._participants[t["id"]])
+        return result
+
+    def _update_participant(self, t, p, fields):
+        seed = fields.pop("seed", None)
+        p.update(fields)
+        if seed is not None:
+            if t["state"] not in _NOT_STARTED:
+                raise _Error(422, "Seeds cannot be changed after the tournament has started")
+            self._move_seed(t, p, seed)
+        p["updated_at"] = _now()
+        return _wrap("participant", p)
+
+    def _destroy_participant(self, t, p):
+        if t["state"] in _NOT_STARTED:
+            del self._participants[t["id"]][p["id"]]
+            self._reseed(t)
+            t["participants_count"] = len(self._participants[t["id"]])
+        else:
+            p["active"] = False
+            p["updated_at"] = _now()
+            self._forfeit(t, p)
+        return _wrap("participant", p)
+
+    def _check_in(self, t, p, checked_in):
+        if t["state"] not in _NOT_STARTED:
+            raise _Error(422, "Check-in is closed")
+        p["checked_in"] = checked_in
+        p["checked_in_at"] = _now() if checked_in else None
+        p["updated_at"] = _now()
+        return _wrap("participant", p)
+
+    def _randomize(self, t):
+        if t["state"] not in _NOT_STARTED:
+            raise _Error(422, "Seeds cannot be changed after the tournament has started")
+        players = self._participants_of(t)
+        self._random.shuffle(players)
+        for seed, p in enumerate(players, 1):
+            p["seed"] = seed
+        return [_wrap("participant", p) for p in self._participants_of(t)]
+
+    def _move_seed(self, t, p, seed):
+        players = [o for o in self._participants_of(t) if o is not p]
+        seed = min(max(1, seed), len(players) + 1)
+        players.insert(seed - 1, p)
+        for seed, o in enumerate(players, 1):
+            o["seed"] = seed
+
+    def _reseed(self, t):
+        # inactive participants move to the bottom seeds
+        players = sorted(self._participants_of(t), key=lambda p: not p["active"])
+        for seed, p in enumerate(players, 1):
+            p["seed"] = seed
+
+    # matches
+
+    def _matches_of(self, t):
+        return sorted(self._matches[t["id"]].values(), key=lambda m: m["suggested_play_order"])
+
+    def _match(self, t, key):
+        m = self._matches[t["id"]].get(_int(key))
+        if m is None:
+            raise _Error(404, "Match not found")
+        return m
+
+    def _index_matches(self, t, params):
+        state = params.get("state", "all")
+        participant_id = _int(params.get("participant_id"))
+        result = []
+        for m in self._matches_of(t):
+            if state != "all" and m["state"] != state:
+                continue
+            if participant_id is not None and participant_id not in (
+                m["player1_id"],
+                m["player2_id"],
+            ):
+                continue
+            result.append(_wrap("match", m))
+        return result
+
+    def _update_match(self, t, m, fields):
+        if t["state"] != "underway" and t["state"] != "awaiting_review":
+            raise _Error(422, "Tournament is not underway")
+        winner_id = fields.pop("winner_id", None)
+        m.update(fields)
+        if winner_id is not None:
+            if m["state"] != "open":
+                raise _Error(422, "Match is not open")
+            players = (m["player1_id"], m["player2_id"])
+            if winner_id == "tie":
+                m.update(winner_id=None, loser_id=None)
+            elif _int(winner_id) in players:
+                winner_id = _int(winner_id)
+                loser_id = players[1] if players[0] == winner_id else players[0]
+                m.update(winner_id=winner_id, loser_id=loser_id)
+            else:
+                raise _Error(422, "Winner must be one of the match's players")
+            m.update(state="complete", completed_at=_now(), underway_at=None)
+            self._advance(t, m)
+        m["updated_at"] = _now()
+        self._update_progress(t)
+        return _wrap("match", m)
+
+    def _reopen(self, t, m):
+        if m["state"] != "complete":
+            raise _Error(422, "Match is not complete")
+        self._clear_dependents(t, m)
+        m.update(state="open", winner_id=None, loser_id=None, completed_at=None)
+        m["updated_at"] = _now()
+        if t["state"] == "awaiting_review":
+            self._set_state(t, "underway")
+        self._update_progress(t)
+        return _wrap("match", m)
+
+    def _mark_as_underway(self, t, m):
+        if m["state"] != "open":
+            raise _Error(422, "Match is not open")
+        m["underway_at"] = m["updated_at"] = _now()
+        return _wrap("match", m)
+
+    def _unmark_as_underway(self, t, m):
+        m["underway_at"] = None
+        m["updated_at"] = _now()
+        return _wrap("match", m)
+
+    def _new_match(self, t, round, p1=None, p2=None, prereq1=None, prereq2=None):
+        matches = self._matches[t["id"]]
+        now = _now()
+        m = {
+            "id": next(self._ids),
+            "tournament_id": t["id"],
+            "state": "open" if p1 is not None and p2 is not None else "pending",
+            "player1_id": p1,
+            "player2_id": p2,
+            "player1_prereq_match_id": prereq1,
+            "player2_prereq_match_id": prereq2,
+            "player1_is_prereq_match_loser": False,
+            "player2_is_prereq_match_loser": False,
+            "winner_id": None,
+            "loser_id": None,
+            "identifier": _identifier(len(matches)),
+            "round": round,
+            "suggested_play_order": len(matches) + 1,
+            "scores_csv": "",
+            "has_attachment": False,
+            "attachment_count": None,
+            "forfeited": None,
+            "player1_votes": None,
+            "player2_votes": None,
+            "location": None,
+            "scheduled_time": None,
+            "started_at": now if p1 is not None and p2 is not None else None,
+            "underway_at": None,
+            "completed_at": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        matches[m["id"]] = m
+        return m
+
+    def _single_elimination(self, t, players):
+        size = 1
+        while size < len(players):
+            size *= 2
+
+        # each slot holds a participant id or ("match", id) of the match it waits on
+        slots = []
+        for a, b in zip(*[iter(_seed_order(size))] * 2):
+            if b > len(players):
+                slots.append(players[a - 1]["id"])
+            else:
+                m = self._new_match(t, 1, players[a - 1]["id"], players[b - 1]["id"])
+                slots.append(("match", m["id"]))
+
+        rnd = 2
+        while len(slots) > 1:
+            next_slots = []
+            for s1, s2 in zip(slots[::2], slots[1::2]):
+                m = self._new_match(
+                    t,
+                    rnd,
+                    s1 if not isinstance(s1, tuple) else None,
+                    s2 if not isinstance(s2, tuple) else None,
+                    s1[1] if isinstance(s1, tuple) else None,
+                    s2[1] if isinstance(s2, tuple) else None,
+                )
+                next_slots.append(("match", m["id"]))
+            slots = next_slots
+            rnd += 1
+
+    def _round_robin(self, t, players):
+        ids = [p["id"] for p in players]
+        if len(ids) % 2:
+            ids.append(None)
+        for rnd in range(1, len(ids)):
+            for i in range(len(ids) // 2):
+                p1, p2 = ids[i], ids[-i - 1]
+                if p1 is not None and p2 is not None:
+                    self._new_match(t, rnd, p1, p2)
+            ids.insert(1, ids.pop())
+
+    def _advance(self, t, m):
+        for other in self._matches[t["id"]].values():
+            for n in ("1", "2"):
+                if other["player%s_prereq_match_id" % n] == m["id"]:
+                    loser = other["player%s_is_prereq_match_loser" % n]
+                    other["player%s_id" % n] = m["loser_id"] if loser else m["winner_id"]
+                    if other["player1_id"] is not None and other["player2_id"] is not None:
+                        other.update(state="open", started_at=_now())
+                    other["updated_at"] = _now()
+
+    def _clear_dependents(self, t, m):
+        for other in self._matches[t["id"]].values():
+            for n in ("1", "2"):
+                if other["player%s_prereq_match_id" % n] == m["id"]:
+                    if other["state"] == "complete":
+                        self._clear_dependents(t, other)
+                    other["player%s_id" % n] = None
+                    other.update(
+                        state="pending",
+                        winner_id=None,
+                        loser_id=None,
+                        scores_csv="",
+                        started_at=None,
+                        completed_at=None,
+                        updated_at=_now(),
+                    )
+
+    def _forfeit(self, t, p):
+        for m in self._matches_of(t):
+            if m["state"] == "open" and p["id"] in (m["player1_id"], m["player2_id"]):
+                winner_id = m["player2_id"] if m["player1_id"] == p["id"] else m["player1_id"]
+                m.update(forfeited=True)
+                self._update_match(t, m, {"winner_id": winner_id})
+
+    def _update_progress(self, t):
+        matches = self._matches[t["id"]].values()
+        done = sum(1 for m in matches if m["state"] == "complete")
+        t["progress_meter"] = int(100 * done / len(matches)) if matches else 0
+        if matches and done == len(matches) and t["state"] == "underway":
+            self._set_state(t, "awaiting_review")
+
+    def _rank(self, t):
+        matches = self._matches_of(t)
+        if t["tournament_type"] == "round robin":
+            wins = dict((p["id"], 0) for p in self._participants_of(t))
+            for m in matches:
+                if m["winner_id"] is not None:
+                    wins[m["winner_id"]] += 1
+            ranked = sorted(wins, key=lambda i: -wins[i])
+            ranks = dict((i, 1 + sum(1 for o in wins if wins[o] > wins[i])) for i in ranked)
+        else:
+            last = max(m["round"] for m in matches)
+            final = [m for m in matches if m["round"] == last][0]
+            ranks = {final["winner_id"]: 1}
+            for m in matches:
+                if m["loser_id"] is not None:
+                    ranks[m["loser_id"]] = 2 ** (last - m["round"]) + 1
+        for p in self._participants_of(t):
+            p["final_rank"] = ranks.get(p["id"])
+
+    # attachments
+
+    def _new_attachment(self, m, fields):
+        now = _now()
+        a = {
+            "id": next(self._ids),
+            "match_id": m["id"],
+            "user_id": None,
+            "description": None,
+            "url": None,
+            "original_file_name": None,
+            "asset_file_name": None,
+            "asset_content_type": None,
+            "asset_file_size": None,
+            "asset_url": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self._set_asset(a, fields)
+        m["attachment_count"] = len(self._attachments.get(m["id"], ())) + 1
+        m["has_attachment"] = True
+        return a
+
+    def _set_asset(self, a, fields):
+        asset = fields.pop("asset", None)
+        a.update(fields)
+        if asset is not None:
+            name = getattr(asset, "name", None) or "asset"
+            a.update(asset_file_name=name, original_file_name=name, asset_url="/" + name)
+
+
+_TOURNAMENT_ACTIONS = frozenset(
+    ("process_check_ins", "abort_check_in", "open_for_predictions", "start", "finalize", "reset")
+)
+_MATCH_ACTIONS = frozenset(("reopen", "mark_as_underway", "unmark_as_underway"))
+
+
+def _response(status, body, url, retry_after=None):
+    response = requests.models.Response()
+    response.status_code = status
+    response.reason = responses.get(status, "")
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json; charset=utf-8"
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    response._content = json.dumps(body).encode("utf-8")
+    response._content_consumed = True
+    return response
+
+
+def _now():
+    now = datetime.datetime.utcnow()
+    return now.strftime("%Y-%m-%dT%H:%M:%S.") + "%03d+00:00" % (now.microsecond // 1000)
+
+
+def _wrap(name, record):
+    return {name: dict(record)}
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _true(value):
+    return value in (True, "true", "1", 1)
+
+
+def _value(key, value):
+    """Convert a form value to the type of the json field."""
+    if key in _TEXT_FIELDS or not isinstance(value, str):
+        return value
+    elif value in ("true", "false"):
+        return value == "true"
+    elif value.isdigit():
+        return int(value)
+    return value
+
+
+def _flat(pairs):
+    return dict(pairs)
+
+
+def _fields(pairs, prefix):
+    """Return the fields of the "prefix[field]" parameters."""
+    fields = {}
+    start = prefix + "["
+    for k, v in pairs:
+        if k.startswith(start) and k.endswith("]"):
+            key = k[len(start) : -1]
+            fields[key] = _value(key, v)
+    return fields
+
+
+def _bulk_fields(pairs, prefix):
+    """Return the records of the "prefix[][field]" parameters of a bulk request."""
+    records = [{}]
+    start = prefix + "["
+    for k, v in pairs:
+        if k.startswith(start) and k.endswith("]"):
+            key = k[len(start) : -1]
+            if key in records[-1]:
+                records.append({})
+            records[-1][key] = _value(key, v)
+    return [r for r in records if r]
+
+
+def _seed_order(size):
+    """Return the seeds of the first round slots of a bracket, ex. 4 -> [1, 4, 2, 3]."""
+    order = [1]
+    while len(order) < size:
+        n = len(order) * 2 + 1
+        order = [s for seed in order for s in (seed, n - seed)]
+    return order
+
+
+def _identifier(n):
+    letters = ""
+    n += 1
+    while n:
+        n, r = divmod(n - 1, 26)
+        letters = chr(ord("A") + r) + letters
+    return letters
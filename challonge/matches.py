@@ -1,33 +1,167 @@
-from challonge import api
+from challonge import api, batch
+from challonge.columns import Columns
 
 
-def index(tournament, **params):
-    """Retrieve a tournament's match list."""
-    return api.fetch_and_parse("GET", "tournaments/%s/matches" % tournament, **params)
+class Matches(object):
+    """The matches operations of a challonge.api.Challonge client.
 
+    The functions of this module are the operations of the default client.
+    """
 
-def show(tournament, match_id, **params):
-    """Retrieve a single match record for a tournament."""
-    return api.fetch_and_parse(
-        "GET", "tournaments/%s/matches/%s" % (tournament, match_id), **params
-    )
+    def __init__(self, client):
+        self._client = client
 
+    def index(self, tournament, **params):
+        """Retrieve a tournament's match list."""
+        return self._client.fetch_and_parse("GET", "tournaments/%s/matches" % tournament, **params)
 
-def update(tournament, match_id, **params):
-    """Update/submit the score(s) for a match."""
-    api.fetch("PUT", "tournaments/%s/matches/%s" % (tournament, match_id), "match", **params)
+    def iter_index(self, tournament, **params):
+        """Iterate over a tournament's match list while it is downloaded."""
+        return self._client.fetch_and_iter("GET", "tournaments/%s/matches" % tournament, **params)
 
+    def index_many(self, tournaments, max_workers=None, **params):
+        """Retrieve the match lists of several tournaments concurrently.
 
-def reopen(tournament, match_id):
-    """Reopens a match that was marked completed, automatically resetting matches that follow it."""
-    api.fetch("POST", "tournaments/%s/matches/%s/reopen" % (tournament, match_id))
+        :param tournaments: the tournaments' names or ids
+        :param max_workers: the maximum number of simultaneous requests
+        :type tournaments: list or tuple
+        :type max_workers: int
+        :return: the match lists keyed by tournament. The exceptions of the
+            failed requests are in its `errors` dictionary
+        :rtype: challonge.batch.BatchResult
 
+        """
+        return batch.run_many(lambda t: self.index(t, **params), tournaments, max_workers)
 
-def mark_as_underway(tournament, match_id):
-    """Sets "underway_at" to the current time and highlights the match in the bracket"""
-    api.fetch("POST", "tournaments/%s/matches/%s/mark_as_underway" % (tournament, match_id))
+    def columns(self, tournament, **params):
+        """Retrieve a tournament's match list as a table of columns.
 
+        The ids, rounds, scores and epoch timestamps of the matches are
+        read straight from the json into arrays, see challonge.columns.
 
-def unmark_as_underway(tournament, match_id):
-    """Clears "underway_at" and unhighlights the match in the bracket"""
-    api.fetch("POST", "tournaments/%s/matches/%s/unmark_as_underway" % (tournament, match_id))
+        :rtype: challonge.columns.Columns
+
+        """
+        response = self._client.fetch("GET", "tournaments/%s/matches" % tournament, **params)
+        return Columns.from_json("match", api._decode(response) or [])
+
+    def show(self, tournament, match_id, **params):
+        """Retrieve a single match record for a tournament."""
+        return self._client.fetch_and_parse(
+            "GET", "tournaments/%s/matches/%s" % (tournament, match_id), **params
+        )
+
+    def update(self, tournament, match_id, **params):
+        """Update/submit the score(s) for a match."""
+        self._client.fetch(
+            "PUT", "tournaments/%s/matches/%s" % (tournament, match_id), "match", **params
+        )
+
+    def bulk_update(self, tournament, updates, max_workers=None, matches=None):
+        """Update/submit the scores of many matches concurrently.
+
+        Matches are updated after the matches of the batch they depend on
+        (see player1_prereq_match_id and player2_prereq_match_id), so a
+        winner advances before the next match is reported. A failed update
+        does not stop the others, but the matches depending on it are not
+        updated.
+
+        :param tournament: the tournament's name or id
+        :param updates: the "match_id" of each match with the parameters
+            of update(), ex. [{"match_id": 1, "scores_csv": "3-1", "winner_id": 7}]
+        :param max_workers: the maximum number of simultaneous requests
+        :param matches: the tournament's match list. It is retrieved
+            with index() if it is not given
+        :type tournament: int or string
+        :type updates: list or tuple
+        :type max_workers: int
+        :type matches: list
+        :return: the updated match ids. The exceptions of the failed
+            updates are in its `errors` dictionary. If the match list
+            cannot be retrieved, its exception is the error of every update
+        :rtype: challonge.batch.BatchResult
+
+        """
+        params = {}
+        for u in updates:
+            u = dict(u)
+            params[u.pop("match_id")] = u
+
+        results = batch.BatchResult()
+        if matches is None and len(params) > 1:
+            try:
+                matches = self.index(tournament)
+            except Exception as e:
+                for match_id in params:
+                    results.errors[match_id] = e
+                return results
+        prereqs = {}
+        for m in matches or []:
+            if m["id"] in params:
+                ids = (m.get("player1_prereq_match_id"), m.get("player2_prereq_match_id"))
+                prereqs[m["id"]] = set(i for i in ids if i in params)
+
+        def _update(match_id):
+            self.update(tournament, match_id, **params[match_id])
+
+        pending = list(params)
+        while pending:
+            ready, waiting = [], []
+            for match_id in pending:
+                deps = prereqs.get(match_id, ())
+                failed = [d for d in deps if d in results.errors]
+                if failed:
+                    results.errors[match_id] = api.ChallongeException(
+                        "Prerequisite match %s was not updated" % failed[0]
+                    )
+                elif all(d in results for d in deps):
+                    ready.append(match_id)
+                else:
+                    waiting.append(match_id)
+
+            if not ready and len(waiting) == len(pending):
+                for match_id in waiting:
+                    results.errors[match_id] = api.ChallongeException(
+                        "Circular prerequisite matches"
+                    )
+                break
+
+            done = batch.run_many(_update, ready, max_workers)
+            results.update(done)
+            results.errors.update(done.errors)
+            pending = waiting
+
+        return results
+
+    def reopen(self, tournament, match_id):
+        """Reopens a match that was marked completed,
+        automatically resetting matches that follow it.
+
+        """
+        self._client.fetch("POST", "tournaments/%s/matches/%s/reopen" % (tournament, match_id))
+
+    def mark_as_underway(self, tournament, match_id):
+        """Sets "underway_at" to the current time and highlights the match in the bracket"""
+        self._client.fetch(
+            "POST", "tournaments/%s/matches/%s/mark_as_underway" % (tournament, match_id)
+        )
+
+    def unmark_as_underway(self, tournament, match_id):
+        """Clears "underway_at" and unhighlights the match in the bracket"""
+        self._client.fetch(
+            "POST", "tournaments/%s/matches/%s/unmark_as_underway" % (tournament, match_id)
+        )
+
+
+_default = api.get_client().matches
+
+index = _default.index
+iter_index = _default.iter_index
+index_many = _default.index_many
+columns = _default.columns
+show = _default.show
+update = _default.update
+bulk_update = _default.bulk_update
+reopen = _default.reopen
+mark_as_underway = _default.mark_as_underway
+unmark_as_underway = _default.unmark_as_underway
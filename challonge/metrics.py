@@ -0,0 +1,157 @@
+"""Instrumentation of the requests sent to challonge.com.
+
+Every function registered with challonge.add_hook() is called with a
+RequestEvent after each request sent by challonge.api. RequestMetrics
+is a hook which aggregates the events by endpoint:
+
+    metrics = challonge.metrics.RequestMetrics()
+    challonge.add_hook(metrics)
+    ...
+    print(metrics.export())
+"""
+import collections
+import math
+import threading
+
+# method, uri and endpoint of the request
+# status: the HTTP status of the response, None if none was received
+# bytes_out, bytes_in: the size of the request and response bodies
+# retries: the number of times the request was sent again
+# cached: True if the response came from the response cache
+# wait: seconds spent in the rate limiter and between retries
+# server: seconds until the response headers were received, including
+#     the DNS lookup, connect and TLS handshake of a new connection
+# download: seconds spent reading the response body
+# parse: seconds spent decoding and parsing the response body
+# total: seconds from the call of the fetch function to its return
+# error: the exception raised by the request or None
+RequestEvent = collections.namedtuple(
+    "RequestEvent",
+    "method uri endpoint status bytes_out bytes_in retries cached "
+    "wait server download parse total error",
+)
+
+_PLACEHOLDERS = {
+    "tournaments": ":tournament",
+    "matches": ":match",
+    "participants": ":participant",
+    "attachments": ":attachment",
+}
+_ACTIONS = frozenset(("bulk_add", "randomize"))
+
+
+def endpoint(uri):
+    """Return the uri with its ids replaced by placeholders.
+
+    ex. endpoint("tournaments/10/matches/42") == "tournaments/:tournament/matches/:match"
+    """
+    parts = uri.split("/")
+    for i in range(1, len(parts)):
+        placeholder = _PLACEHOLDERS.get(parts[i - 1])
+        if placeholder is not None and parts[i] not in _ACTIONS:
+            parts[i] = placeholder
+    return "/".join(parts)
+
+
+def _percentile(ordered, p):
+    # nearest rank
+    return ordered[max(0, int(math.ceil(p / 100.0 * len(ordered))) - 1)]
+
+
+class _Endpoint(object):
+    __slots__ = ("count", "errors", "retries", "bytes_out", "bytes_in", "durations")
+
+    def __init__(self, window):
+        self.count = self.errors = self.retries = self.bytes_out = self.bytes_in = 0
+        self.durations = collections.deque(maxlen=window)
+
+
+class RequestMetrics(object):
+    """A hook which aggregates the RequestEvents by method and endpoint.
+
+    It counts the requests, errors, retries and bytes of every endpoint
+    and keeps the durations of its last `window` requests to compute
+    the percentiles. It can be shared by many threads.
+
+    :keyword param window: the number of durations kept by endpoint
+    :keyword param percentiles: the percentiles reported by summary()
+        and export()
+    """
+
+    def __init__(self, window=1000, percentiles=(50, 95, 99)):
+        self.window = window
+        self.percentiles = tuple(percentiles)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        key = (event.method, event.endpoint)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _Endpoint(self.window)
+            stats.count += 1
+            if event.error is not None:
+                stats.errors += 1
+            stats.retries += event.retries
+            stats.bytes_out += event.bytes_out
+            stats.bytes_in += event.bytes_in or 0
+            stats.durations.append(event.total)
+
+    def summary(self):
+        """Return the aggregated metrics.
+
+        :return
+            a dict by (method, endpoint) of dicts with the count,
+            errors, retries, bytes_out and bytes_in of the endpoint,
+            and its duration percentiles in seconds as "p50", "p95"...
+        """
+        result = {}
+        with self._lock:
+            for key, stats in self._endpoints.items():
+                ordered = sorted(stats.durations)
+                item = result[key] = {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "bytes_out": stats.bytes_out,
+                    "bytes_in": stats.bytes_in,
+                }
+                for p in self.percentiles:
+                    item["p%g" % p] = _percentile(ordered, p) if ordered else None
+        return result
+
+    def export(self):
+        """Return the metrics in the Prometheus text format."""
+        lines = []
+        summary = sorted(self.summary().items())
+        counters = (
+            ("count", "challonge_requests_total", "Requests sent"),
+            ("errors", "challonge_request_errors_total", "Requests which raised an error"),
+            ("retries", "challonge_request_retries_total", "Requests sent again"),
+            ("bytes_out", "challonge_request_bytes_total", "Bytes of the request bodies"),
+            ("bytes_in", "challonge_response_bytes_total", "Bytes of the response bodies"),
+        )
+        for field, name, help_text in counters:
+            lines.append("# HELP %s %s" % (name, help_text))
+            lines.append("# TYPE %s counter" % name)
+            for (method, path), item in summary:
+                lines.append('%s{method="%s",endpoint="%s"} %d' % (name, method, path, item[field]))
+
+        name = "challonge_request_duration_seconds"
+        lines.append("# HELP %s Duration of the requests" % name)
+        lines.append("# TYPE %s summary" % name)
+        for (method, path), item in summary:
+            for p in self.percentiles:
+                value = item["p%g" % p]
+                if value is not None:
+                    lines.append(
+                        '%s{method="%s",endpoint="%s",quantile="%g"} %.6f'
+                        % (name, method, path, p / 100.0, value)
+                    )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Forget all the metrics."""
+        with self._lock:
+            self._endpoints.clear()
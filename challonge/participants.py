@@ -1,82 +1,135 @@
-from challonge import api
+from challonge import api, batch
+from challonge.columns import Columns
 
 
-def index(tournament):
-    """Retrieve a tournament's participant list."""
-    return api.fetch_and_parse("GET", "tournaments/%s/participants" % tournament)
-
-
-def create(tournament, name, **params):
-    """Add a participant to a tournament."""
-    params.update({"name": name})
-
-    return api.fetch_and_parse(
-        "POST", "tournaments/%s/participants" % tournament, "participant", **params
-    )
-
-
-def bulk_add(tournament, names, **params):
-    """Bulk add participants to a tournament (up until it is started).
-
-    :param tournament: the tournament's name or id
-    :param names: the names of the participants
-    :type tournament: int or string
-    :type names: list or tuple
-    :return: each participants info
-    :rtype: a list of dictionaries
+class Participants(object):
+    """The participants operations of a challonge.api.Challonge client.
 
+    The functions of this module are the operations of the default client.
     """
-    params.update({"name": names})
-
-    return api.fetch_and_parse(
-        "POST", "tournaments/%s/participants/bulk_add" % tournament, "participants[]", **params
-    )
-
-
-def show(tournament, participant_id, **params):
-    """Retrieve a single participant record for a tournament."""
-    return api.fetch_and_parse(
-        "GET", "tournaments/%s/participants/%s" % (tournament, participant_id), **params
-    )
-
-
-def update(tournament, participant_id, **params):
-    """Update the attributes of a tournament participant."""
-    api.fetch(
-        "PUT",
-        "tournaments/%s/participants/%s" % (tournament, participant_id),
-        "participant",
-        **params
-    )
 
+    def __init__(self, client):
+        self._client = client
+
+    def index(self, tournament):
+        """Retrieve a tournament's participant list."""
+        return self._client.fetch_and_parse("GET", "tournaments/%s/participants" % tournament)
 
-def check_in(tournament, participant_id):
-    """Checks a participant in."""
-    api.fetch("POST", "tournaments/%s/participants/%s/check_in" % (tournament, participant_id))
+    def iter_index(self, tournament):
+        """Iterate over a tournament's participant list while it is downloaded."""
+        return self._client.fetch_and_iter("GET", "tournaments/%s/participants" % tournament)
 
+    def index_many(self, tournaments, max_workers=None):
+        """Retrieve the participant lists of several tournaments concurrently.
 
-def undo_check_in(tournament, participant_id):
-    """Marks a participant as having not checked in."""
-    api.fetch("POST", "tournaments/%s/participants/%s/undo_check_in" % (tournament, participant_id))
+        :param tournaments: the tournaments' names or ids
+        :param max_workers: the maximum number of simultaneous requests
+        :type tournaments: list or tuple
+        :type max_workers: int
+        :return: the participant lists keyed by tournament. The exceptions
+            of the failed requests are in its `errors` dictionary
+        :rtype: challonge.batch.BatchResult
 
-
-def destroy(tournament, participant_id):
-    """Destroys or deactivates a participant.
-
-    If tournament has not started, delete a participant, automatically
-    filling in the abandoned seed number.
-
-    If tournament is underway, mark a participant inactive, automatically
-    forfeiting his/her remaining matches.
-
-    """
-    api.fetch("DELETE", "tournaments/%s/participants/%s" % (tournament, participant_id))
-
-
-def randomize(tournament):
-    """Randomize seeds among participants.
-
-    Only applicable before a tournament has started.
-
-    """
-    api.fetch("POST", "tournaments/%s/participants/randomize" % tournament)
+        """
+        return batch.run_many(self.index, tournaments, max_workers)
+
+    def columns(self, tournament):
+        """Retrieve a tournament's participant list as a table of columns.
+
+        See challonge.columns.
+
+        :rtype: challonge.columns.Columns
+
+        """
+        response = self._client.fetch("GET", "tournaments/%s/participants" % tournament)
+        return Columns.from_json("participant", api._decode(response) or [])
+
+    def create(self, tournament, name, **params):
+        """Add a participant to a tournament."""
+        params.update({"name": name})
+
+        return self._client.fetch_and_parse(
+            "POST", "tournaments/%s/participants" % tournament, "participant", **params
+        )
+
+    def bulk_add(self, tournament, names, **params):
+        """Bulk add participants to a tournament (up until it is started).
+
+        :param tournament: the tournament's name or id
+        :param names: the names of the participants
+        :type tournament: int or string
+        :type names: list or tuple
+        :return: each participants info
+        :rtype: a list of dictionaries
+
+        """
+        params.update({"name": names})
+
+        return self._client.fetch_and_parse(
+            "POST", "tournaments/%s/participants/bulk_add" % tournament, "participants[]", **params
+        )
+
+    def show(self, tournament, participant_id, **params):
+        """Retrieve a single participant record for a tournament."""
+        return self._client.fetch_and_parse(
+            "GET", "tournaments/%s/participants/%s" % (tournament, participant_id), **params
+        )
+
+    def update(self, tournament, participant_id, **params):
+        """Update the attributes of a tournament participant."""
+        self._client.fetch(
+            "PUT",
+            "tournaments/%s/participants/%s" % (tournament, participant_id),
+            "participant",
+            **params
+        )
+
+    def check_in(self, tournament, participant_id):
+        """Checks a participant in."""
+        self._client.fetch(
+            "POST", "tournaments/%s/participants/%s/check_in" % (tournament, participant_id)
+        )
+
+    def undo_check_in(self, tournament, participant_id):
+        """Marks a participant as having not checked in."""
+        self._client.fetch(
+            "POST", "tournaments/%s/participants/%s/undo_check_in" % (tournament, participant_id)
+        )
+
+    def destroy(self, tournament, participant_id):
+        """Destroys or deactivates a participant.
+
+        If tournament has not started, delete a participant, automatically
+        filling in the abandoned seed number.
+
+        If tournament is underway, mark a participant inactive, automatically
+        forfeiting his/her remaining matches.
+
+        """
+        self._client.fetch(
+            "DELETE", "tournaments/%s/participants/%s" % (tournament, participant_id)
+        )
+
+    def randomize(self, tournament):
+        """Randomize seeds among participants.
+
+        Only applicable before a tournament has started.
+
+        """
+        self._client.fetch("POST", "tournaments/%s/participants/randomize" % tournament)
+
+
+_default = api.get_client().participants
+
+index = _default.index
+iter_index = _default.iter_index
+index_many = _default.index_many
+columns = _default.columns
+create = _default.create
+bulk_add = _default.bulk_add
+show = _default.show
+update = _default.update
+check_in = _default.check_in
+undo_check_in = _default.undo_check_in
+destroy = _default.destroy
+randomize = _default.randomize
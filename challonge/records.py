@@ -0,0 +1,213 @@
+"""Record types returned by api._parse() besides plain dictionaries."""
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:  # Python 2
+    from collections import Mapping, MutableMapping
+
+from challonge import schema
+
+try:
+    _TEXT = unicode
+except NameError:
+    _TEXT = str
+
+
+class LazyRecord(MutableMapping):
+    """A dictionary-like record which converts its fields on first access.
+
+    The record keeps the values decoded from the json and converts a
+    field to its python type (ex. a datetime) only when it is read.
+    The converted value is cached, so the conversion happens once.
+    The timezone in use at the time of the first access is applied.
+
+    Lazy records compare equal to dictionaries with the same parsed
+    items and can be changed like them. to_dict() returns a plain
+    dictionary with every field converted.
+    """
+
+    __slots__ = ("_resource", "_data", "_converted", "_convert")
+
+    def __init__(self, resource, data, convert):
+        self._resource = resource
+        self._data = data
+        self._converted = set()
+        self._convert = convert
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if key not in self._converted:
+            value = self._convert(self._resource, key, value)
+            self._data[key] = value
+            self._converted.add(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._converted.add(key)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._converted.discard(key)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.to_dict())
+
+    def to_dict(self):
+        """Return a plain dictionary with all the fields converted."""
+        return {k: self[k] for k in self._data}
+
+
+class Record(Mapping):
+    """A compact record storing its fields in __slots__.
+
+    The fields of the schema of a resource are read as attributes or
+    like the items of a dictionary, ex. match.state or match["state"].
+    Fields missing from the schema are kept in a dictionary and can be
+    read the same way. Records are read-only mappings and compare equal
+    to dictionaries with the same items. to_dict() returns a plain
+    dictionary.
+
+    On Python 2 collections.Mapping has no __slots__, so the records
+    also have a __dict__ there and take about as much memory as a
+    dictionary.
+    """
+
+    __slots__ = ("_extra",)
+    _fields = frozenset()
+
+    @classmethod
+    def from_json(cls, fields, convert, types):
+        """Build a record from the decoded json fields of a record.
+
+        The text values are converted with convert(types, key, value)
+        while the fields are stored, in a single pass over them.
+        """
+        record = cls.__new__(cls)
+        names = cls._fields
+        extra = None
+        for k, v in fields.items():
+            if isinstance(v, _TEXT):
+                v = convert(types, k, v)
+            if k in names:
+                object.__setattr__(record, k, v)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[k] = v
+        record._extra = extra
+        return record
+
+    @classmethod
+    def from_dict(cls, d):
+        """Build a record from a dictionary of parsed fields."""
+        record = cls.__new__(cls)
+        extra = None
+        for k, v in d.items():
+            if k in cls._fields:
+                object.__setattr__(record, k, v)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[k] = v
+        record._extra = extra
+        return record
+
+    def __getattr__(self, name):
+        # called only for unset slots and names which are not slots
+        if name != "_extra" and name not in self._fields:
+            extra = self._extra
+            if extra and name in extra:
+                return extra[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            value = getattr(self, key, _MISSING)
+        elif self._extra:
+            value = self._extra.get(key, _MISSING)
+        else:
+            value = _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for name in self.__slots__:
+            if getattr(self, name, _MISSING) is not _MISSING:
+                yield name
+        if self._extra:
+            for name in self._extra:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __reduce__(self):
+        return _rebuild, (type(self), self.to_dict())
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.to_dict())
+
+    def to_dict(self):
+        """Return the fields as a plain dictionary."""
+        return {k: self[k] for k in self}
+
+
+_MISSING = object()
+
+
+def _rebuild(cls, d):
+    return cls.from_dict(d)
+
+
+class Tournament(Record):
+    """A tournament, see challonge.schema.TOURNAMENT for its fields."""
+
+    __slots__ = tuple(schema.TOURNAMENT)
+    _fields = frozenset(__slots__)
+
+
+class Match(Record):
+    """A match, see challonge.schema.MATCH for its fields."""
+
+    __slots__ = tuple(schema.MATCH)
+    _fields = frozenset(__slots__)
+
+
+class Participant(Record):
+    """A participant, see challonge.schema.PARTICIPANT for its fields."""
+
+    __slots__ = tuple(schema.PARTICIPANT)
+    _fields = frozenset(__slots__)
+
+
+class Attachment(Record):
+    """A match attachment, see challonge.schema.ATTACHMENT for its fields."""
+
+    __slots__ = tuple(schema.ATTACHMENT)
+    _fields = frozenset(__slots__)
+
+
+# the record classes by the names the API wraps the records with
+RECORD_CLASSES = {
+    "tournament": Tournament,
+    "match": Match,
+    "participant": Participant,
+    "match_attachment": Attachment,
+}
@@ -0,0 +1,196 @@
+"""Poll many tournaments, spending the request budget on the live ones."""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from challonge import api, throttle
+from challonge.sync import TournamentSync
+
+logger = logging.getLogger(__name__)
+
+# the base seconds between two polls of a tournament by its state
+STATE_INTERVALS = {
+    "underway": 5.0,
+    "group_stages_underway": 5.0,
+    "checking_in": 15.0,
+    "checked_in": 15.0,
+    "awaiting_review": 15.0,
+    "group_stages_finalized": 30.0,
+    "accepting_predictions": 60.0,
+    "pending": 60.0,
+    "complete": 900.0,
+}
+DEFAULT_INTERVAL = 60.0
+
+
+class _Watch(object):
+    __slots__ = ("tournament", "sync", "state", "updated_at", "interval", "due")
+
+    def __init__(self, tournament, client):
+        self.tournament = tournament
+        self.sync = TournamentSync(tournament, resources=("matches",), client=client)
+        self.state = None
+        self.updated_at = None
+        self.interval = None
+        self.due = 0.0
+
+
+class PollScheduler(object):
+    """Poll tournaments with tournaments.show() and matches.index() adaptively.
+
+    The interval between two polls of a tournament starts from the base
+    interval of its state (see STATE_INTERVALS). It is halved every time
+    the tournament has changed since the previous poll and grows by half
+    every time it has not, within [min_interval, base * max_factor].
+
+    All the polls share one request budget of `requests_per_second`
+    (a poll costs two requests), and the most overdue tournament is
+    always polled first, so a tight budget is spent on the tournaments
+    that change often.
+
+    After every poll the callbacks are called as
+    callback(tournament, record, events), where record is the result of
+    tournaments.show() and events are the challonge.sync.Events of the
+    matches. A failed poll is retried after twice its interval, its
+    exception is passed to on_error(tournament, exception) or logged,
+    and so are the exceptions raised by the callbacks.
+
+    :keyword param requests_per_second: the request budget
+    :keyword param intervals: base intervals overriding STATE_INTERVALS
+    :keyword param min_interval: the shortest seconds between two polls
+    :keyword param max_factor: how many times the base interval of the
+        state the interval can grow to
+    :keyword param on_error: called with the tournament and the exception
+        of a failed poll
+    :keyword param client: the challonge.api.Challonge client of the
+        polls. None uses the default client
+    """
+
+    def __init__(
+        self,
+        requests_per_second=1.0,
+        intervals=None,
+        min_interval=2.0,
+        max_factor=4.0,
+        on_error=None,
+        client=None,
+    ):
+        self.client = client or api.get_client()
+        self.intervals = dict(STATE_INTERVALS, **(intervals or {}))
+        self.min_interval = min_interval
+        self.max_factor = max_factor
+        self.on_error = on_error
+        self._limiter = throttle.RateLimiter(requests_per_second, burst=2)
+        self._watches = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._callbacks = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def add(self, tournament):
+        """Start polling a tournament, first as soon as possible."""
+        with self._lock:
+            if tournament not in self._watches:
+                watch = self._watches[tournament] = _Watch(tournament, self.client)
+                heapq.heappush(self._heap, (watch.due, next(self._counter), watch))
+
+    def remove(self, tournament):
+        """Stop polling a tournament."""
+        with self._lock:
+            self._watches.pop(tournament, None)
+
+    def add_callback(self, callback):
+        """Call callback(tournament, record, events) after every poll."""
+        self._callbacks.append(callback)
+
+    def interval(self, tournament):
+        """Return the current seconds between two polls of a tournament."""
+        return self._watches[tournament].interval
+
+    def tick(self):
+        """Poll every tournament which is due.
+
+        :return
+            the number of polled tournaments
+        """
+        polled = 0
+        while not self._stop.is_set():
+            watch = self._pop_due()
+            if watch is None:
+                break
+            self._poll(watch)
+            polled += 1
+        return polled
+
+    def run(self):
+        """Poll the tournaments until stop() is called."""
+        self._stop.clear()
+        while not self._stop.is_set():
+            self.tick()
+            with self._lock:
+                wait = self._heap[0][0] - time.time() if self._heap else self.min_interval
+            self._stop.wait(max(0.0, min(wait, self.min_interval)))
+
+    def stop(self):
+        """Make run() return after the poll in progress."""
+        self._stop.set()
+
+    def _pop_due(self):
+        with self._lock:
+            while self._heap and self._heap[0][0] <= time.time():
+                _, _, watch = heapq.heappop(self._heap)
+                if self._watches.get(watch.tournament) is watch:
+                    return watch
+        return None
+
+    def _reschedule(self, watch):
+        watch.due = time.time() + watch.interval
+        with self._lock:
+            if self._watches.get(watch.tournament) is watch:
+                heapq.heappush(self._heap, (watch.due, next(self._counter), watch))
+
+    def _poll(self, watch):
+        try:
+            self._limiter.acquire()
+            record = self.client.tournaments.show(watch.tournament)
+            self._limiter.acquire()
+            events = watch.sync.poll()
+        except Exception as e:
+            watch.interval = min(
+                (watch.interval or self.min_interval) * 2, self._max_interval(watch.state)
+            )
+            self._error(watch.tournament, e, "Polling tournament %s failed: %r")
+        else:
+            changed = bool(events) or record.get("updated_at") != watch.updated_at
+            watch.updated_at = record.get("updated_at")
+            self._adapt(watch, record.get("state"), changed)
+            for callback in self._callbacks:
+                try:
+                    callback(watch.tournament, record, events)
+                except Exception as e:
+                    self._error(watch.tournament, e, "Callback of tournament %s failed: %r")
+        finally:
+            self._reschedule(watch)
+
+    def _error(self, tournament, e, message):
+        if self.on_error is not None:
+            self.on_error(tournament, e)
+        else:
+            logger.warning(message, tournament, e)
+
+    def _max_interval(self, state):
+        return self.intervals.get(state, DEFAULT_INTERVAL) * self.max_factor
+
+    def _adapt(self, watch, state, changed):
+        base = self.intervals.get(state, DEFAULT_INTERVAL)
+        if state != watch.state or watch.interval is None:
+            interval = base
+        elif changed:
+            interval = watch.interval / 2
+        else:
+            interval = watch.interval * 1.5
+        watch.state = state
+        watch.interval = max(self.min_interval, min(interval, base * self.max_factor))
@@ -0,0 +1,229 @@
+"""The fields of the records returned by the Challonge API and their types.
+
+The keys of FIELDS are the names the API wraps every record with,
+ex. {"tournament": {"url": "7k1safq" ...}}. Each field maps to the type
+its string values are converted to by api._parse(). Fields that are
+missing from these maps are converted by trying the known types in turn.
+"""
+
+# the value is kept as it was decoded from the json
+RAW = None
+# an ISO 8601 timestamp
+DATETIME = "datetime"
+# a decimal number sent as a string, ex. "0.5"
+FLOAT = "float"
+
+
+def _fields(raw=(), datetimes=(), floats=()):
+    fields = dict.fromkeys(raw, RAW)
+    fields.update(dict.fromkeys(datetimes, DATETIME))
+    fields.update(dict.fromkeys(floats, FLOAT))
+    return fields
+
+
+TOURNAMENT = _fields(
+    raw=(
+        "id",
+        "name",
+        "url",
+        "description",
+        "description_source",
+        "tournament_type",
+        "state",
+        "subdomain",
+        "full_challonge_url",
+        "live_image_url",
+        "sign_up_url",
+        "require_score_agreement",
+        "notify_users_when_matches_open",
+        "notify_users_when_the_tournament_ends",
+        "open_signup",
+        "progress_meter",
+        "quick_advance",
+        "hold_third_place_match",
+        "swiss_rounds",
+        "private",
+        "ranked_by",
+        "show_rounds",
+        "hide_forum",
+        "sequential_pairings",
+        "accept_attachments",
+        "created_by_api",
+        "credit_capped",
+        "category",
+        "hide_seeds",
+        "prediction_method",
+        "anonymous_voting",
+        "max_predictions_per_user",
+        "signup_cap",
+        "game_id",
+        "game_name",
+        "participants_count",
+        "group_stages_enabled",
+        "group_stages_were_started",
+        "allow_participant_match_reporting",
+        "teams",
+        "check_in_duration",
+        "tie_breaks",
+        "event_id",
+        "public_predictions_before_start_time",
+        "ranked",
+        "grand_finals_modifier",
+        "predict_the_losers_bracket",
+        "spam",
+        "ham",
+        "rr_iterations",
+        "tournament_registration_id",
+        "donation_contest_enabled",
+        "mandatory_donation",
+        "non_elimination_tournament_data",
+        "auto_assign_stations",
+        "only_start_matches_with_stations",
+        "registration_type",
+        "split_participants",
+        "allowed_regions",
+        "show_participant_country",
+        "program_id",
+        "program_classification_ids_allowed",
+        "team_size_range",
+        "toggle_waitlist",
+        "consolation_matches_target_rank",
+        "review_before_finalizing",
+        "accepting_predictions",
+        "participants_locked",
+        "participants_swappable",
+        "team_convertable",
+    ),
+    datetimes=(
+        "created_at",
+        "updated_at",
+        "started_at",
+        "completed_at",
+        "start_at",
+        "started_checking_in_at",
+        "predictions_opened_at",
+        "locked_at",
+    ),
+    floats=(
+        "pts_for_match_win",
+        "pts_for_match_tie",
+        "pts_for_game_win",
+        "pts_for_game_tie",
+        "pts_for_bye",
+        "rr_pts_for_match_win",
+        "rr_pts_for_match_tie",
+        "rr_pts_for_game_win",
+        "rr_pts_for_game_tie",
+        "registration_fee",
+    ),
+)
+
+MATCH = _fields(
+    raw=(
+        "id",
+        "tournament_id",
+        "state",
+        "player1_id",
+        "player2_id",
+        "player1_prereq_match_id",
+        "player2_prereq_match_id",
+        "player1_is_prereq_match_loser",
+        "player2_is_prereq_match_loser",
+        "winner_id",
+        "loser_id",
+        "identifier",
+        "has_attachment",
+        "round",
+        "player1_votes",
+        "player2_votes",
+        "group_id",
+        "attachment_count",
+        "location",
+        "optional",
+        "rushb_id",
+        "suggested_play_order",
+        "forfeited",
+        "open_graph_image_file_name",
+        "open_graph_image_content_type",
+        "open_graph_image_file_size",
+        "prerequisite_match_ids_csv",
+        "scores_csv",
+    ),
+    datetimes=(
+        "created_at",
+        "updated_at",
+        "started_at",
+        "completed_at",
+        "underway_at",
+        "scheduled_time",
+    ),
+)
+
+PARTICIPANT = _fields(
+    raw=(
+        "id",
+        "tournament_id",
+        "name",
+        "seed",
+        "active",
+        "invite_email",
+        "final_rank",
+        "misc",
+        "icon",
+        "on_waiting_list",
+        "invitation_id",
+        "group_id",
+        "ranked_member_id",
+        "custom_field_response",
+        "clinch",
+        "integration_uids",
+        "challonge_username",
+        "challonge_email_address_verified",
+        "removable",
+        "participatable_or_invitation_attached",
+        "confirm_remove",
+        "invitation_pending",
+        "display_name_with_invitation_email_address",
+        "email_hash",
+        "username",
+        "display_name",
+        "attached_participatable_portrait_url",
+        "can_check_in",
+        "checked_in",
+        "reactivatable",
+        "check_in_open",
+        "group_player_ids",
+        "has_irrelevant_seed",
+    ),
+    datetimes=(
+        "created_at",
+        "updated_at",
+        "checked_in_at",
+    ),
+)
+
+ATTACHMENT = _fields(
+    raw=(
+        "id",
+        "match_id",
+        "user_id",
+        "description",
+        "url",
+        "original_file_name",
+        "asset_file_name",
+        "asset_content_type",
+        "asset_file_size",
+        "asset_url",
+    ),
+    datetimes=(
+        "created_at",
+        "updated_at",
+    ),
+)
+
+FIELDS = {
+    "tournament": TOURNAMENT,
+    "match": MATCH,
+    "participant": PARTICIPANT,
+    "match_attachment": ATTACHMENT,
+}
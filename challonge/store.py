@@ -0,0 +1,238 @@
+"""A persistent store of the responses of completed tournaments.
+
+Once a tournament is complete its matches, participants and attachments
+do not change anymore. A TournamentStore keeps the responses of these
+GET requests for completed tournaments in a SQLite database, and serves
+them in later runs without contacting challonge.com:
+
+    challonge.configure_store("challonge.sqlite")
+    challonge.matches.index("my_tourney")  # downloaded once, then read from disk
+
+The store learns that a tournament is complete from the tournament
+records parsed by the library, ex. the response of tournaments.show()
+or tournaments.index(). The tournament records themselves are never
+stored, they are always requested. A change request to a tournament
+through the library, ex. tournaments.reset(), drops everything stored
+for it, and so does a tournament record which is no longer complete or
+which was updated since it was stored. A tournament reset by another
+program is noticed by the next tournaments.show() or tournaments.index()
+of it; until then its lists are served from the store.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from challonge import api, batch
+from challonge.cache import _identifiers, _tournament
+
+# bump when the layout of the database changes, older files are emptied
+SCHEMA_VERSION = 1
+
+_SCHEMA = (
+    "CREATE TABLE identifiers (identifier TEXT PRIMARY KEY, tournament_id INTEGER NOT NULL)",
+    "CREATE TABLE tournaments (tournament_id INTEGER PRIMARY KEY, updated_at TEXT)",
+    "CREATE TABLE responses (key TEXT PRIMARY KEY, tournament_id INTEGER NOT NULL,"
+    " body BLOB NOT NULL, stored_at REAL NOT NULL)",
+    "CREATE INDEX responses_tournament ON responses (tournament_id)",
+)
+
+
+class TournamentStore(object):
+    """Responses of completed tournaments stored in a SQLite database.
+
+    A tournament is stored by its id, and found by its id, its url or
+    its "subdomain-url" identifier. The store can be shared by many
+    threads and, through the file, by many processes.
+
+    :param path: the path of the database file, created if it is missing.
+        ":memory:" keeps the store in memory
+    :keyword param ttl: seconds a response is served before it is
+        downloaded again. None serves it forever
+    """
+
+    def __init__(self, path, ttl=None):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in ("identifiers", "tournaments", "responses"):
+                    self._db.execute("DROP TABLE IF EXISTS %s" % table)
+                for statement in _SCHEMA:
+                    self._db.execute(statement)
+                self._db.execute("PRAGMA user_version = %d" % SCHEMA_VERSION)
+
+    def __len__(self):
+        """Return the number of stored responses."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(uri, params, tournament_id):
+        """Return the key of a request, which names the tournament by its id."""
+        parts = uri.split("/")
+        parts[1] = str(tournament_id)
+        return json.dumps(["/".join(parts), params], separators=(",", ":"))
+
+    def get(self, uri, params):
+        """Return the stored body of a GET request or None."""
+        if uri.count("/") < 2:
+            return None  # the tournament records are always requested
+        identifier = _tournament(uri)
+        if identifier is None:
+            return None
+        with self._lock:
+            tournament_id = self._tournament_id(identifier)
+            if tournament_id is None:
+                return None
+            row = self._db.execute(
+                "SELECT body, stored_at FROM responses WHERE key = ?",
+                (self.key(uri, params, tournament_id),),
+            ).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] >= self.ttl):
+            return None
+        return bytes(row[0])
+
+    def offer(self, uri, params, body):
+        """Store the body of a GET response if its tournament is known to be complete.
+
+        Only the matches, participants and attachments are stored, see learn().
+        """
+        parts = uri.split("/")
+        if parts[0] != "tournaments" or len(parts) < 3:
+            return
+
+        with self._lock, self._db:
+            tournament_id = self._tournament_id(parts[1])
+            if tournament_id is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (
+                        self.key(uri, params, tournament_id),
+                        tournament_id,
+                        sqlite3.Binary(body),
+                        time.time(),
+                    ),
+                )
+
+    def learn(self, uri, data):
+        """Update which tournaments are complete from the decoded json of a GET response.
+
+        :param uri: the uri of the request, ex. "tournaments" or "tournaments/my_tourney"
+        :param data: its decoded response
+        """
+        parts = uri.split("/")
+        if parts[0] != "tournaments" or len(parts) > 2:
+            return
+        if len(parts) == 1:
+            for wrapped in data or []:
+                self._learn(None, wrapped.get("tournament") or {})
+        else:
+            self._learn(parts[1], (data or {}).get("tournament") or {})
+
+    def invalidate(self, uri):
+        """Drop everything stored for the tournament changed by a request to uri."""
+        identifier = _tournament(uri)
+        if identifier is None:
+            return
+        with self._lock, self._db:
+            tournament_id = self._tournament_id(identifier)
+            if tournament_id is not None:
+                self._forget(tournament_id)
+
+    def clear(self):
+        """Drop all the stored tournaments."""
+        with self._lock, self._db:
+            for table in ("identifiers", "tournaments", "responses"):
+                self._db.execute("DELETE FROM %s" % table)
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def warm(self, tournaments, attachments=False, max_workers=None, client=None):
+        """Download and store completed tournaments ahead of time.
+
+        The tournament, its matches and its participants are stored,
+        and the attachments of its matches if `attachments` is True.
+        Tournaments which are not complete are skipped.
+
+        :param tournaments: the tournaments' names or ids
+        :keyword param attachments: also store the match attachments
+        :keyword param max_workers: the maximum number of simultaneous requests
+        :keyword param client: the challonge.api.Challonge client of the
+            requests. None uses the default client
+
+        :return
+            a challonge.batch.BatchResult of True for the stored
+            tournaments and False for the skipped ones
+        """
+        client = client or api.get_client()
+        return batch.run_many(
+            lambda t: self._warm(client, t, attachments), tournaments, max_workers
+        )
+
+    def _warm(self, client, tournament, attachments):
+        uri = "tournaments/%s" % tournament
+        if not self._learn(str(tournament), api._decode(client.fetch("GET", uri))["tournament"]):
+            return False
+        matches = self._fetch(client, uri + "/matches")
+        self._fetch(client, uri + "/participants")
+        if attachments:
+            for wrapped in api._loads(matches) or []:
+                match = wrapped["match"]
+                if match.get("attachment_count"):
+                    self._fetch(client, "%s/matches/%s/attachments" % (uri, match["id"]))
+        return True
+
+    def _fetch(self, client, uri):
+        body = self.get(uri, [])
+        if body is None:
+            body = client.fetch("GET", uri).content
+            if client.get_store() is not self:
+                self.offer(uri, [], body)
+        return body
+
+    def _learn(self, identifier, fields):
+        """Record whether the tournament of a tournament record is complete.
+
+        :return
+            True if it is complete
+        """
+        tournament_id = fields.get("id")
+        if tournament_id is None:
+            return False
+        updated_at = fields.get("updated_at")
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT updated_at FROM tournaments WHERE tournament_id = ?", (tournament_id,)
+            ).fetchone()
+            if row is not None and row[0] != updated_at:
+                self._forget(tournament_id)
+            if fields.get("state") != "complete":
+                if row is not None:
+                    self._forget(tournament_id)
+                return False
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO identifiers VALUES (?, ?)",
+                [(i, tournament_id) for i in _identifiers(identifier, fields)],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO tournaments VALUES (?, ?)", (tournament_id, updated_at)
+            )
+        return True
+
+    def _tournament_id(self, identifier):
+        row = self._db.execute(
+            "SELECT tournament_id FROM identifiers WHERE identifier = ?", (identifier,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _forget(self, tournament_id):
+        for table in ("identifiers", "tournaments", "responses"):
+            self._db.execute("DELETE FROM %s WHERE tournament_id = ?" % table, (tournament_id,))
@@ -0,0 +1,101 @@
+"""Incremental synchronization of the matches and participants of a tournament."""
+from collections import namedtuple
+
+from challonge import api
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+# kind: ADDED, CHANGED or REMOVED
+# resource: "matches" or "participants"
+# record: the parsed record, or the last known one if it was removed
+# previous: the last known record of a changed record, otherwise None
+Event = namedtuple("Event", ["kind", "resource", "id", "record", "previous"])
+
+
+class TournamentSync(object):
+    """Keep the last known state of a tournament and report what changed.
+
+    Every poll() retrieves the match and participant lists of the
+    tournament and compares each record with the last known one by its
+    updated_at field. Only the new and changed records are parsed, and
+    an Event is passed to the registered callbacks for each added,
+    changed or removed record. The first poll reports every record as
+    added.
+
+    With the response cache enabled (see api.configure_cache) an
+    unchanged list costs a revalidation request and no parsing at all.
+
+    :param tournament: the tournament's name or id
+    :keyword param resources: the synchronized lists,
+        "matches" and/or "participants"
+    :keyword param client: the challonge.api.Challonge client of the
+        requests. None uses the default client
+    """
+
+    def __init__(self, tournament, resources=("matches", "participants"), client=None):
+        self.tournament = tournament
+        self.client = client or api.get_client()
+        self.resources = tuple(resources)
+        self._callbacks = []
+        # resource -> record id -> (updated_at, parsed record)
+        self._known = dict((resource, {}) for resource in self.resources)
+        self._responses = {}
+
+    def add_callback(self, callback):
+        """Call callback(event) for every change found by poll()."""
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Stop calling a callback registered with add_callback()."""
+        self._callbacks.remove(callback)
+
+    def records(self, resource):
+        """Return the last known records of "matches" or "participants"."""
+        return [record for _, record in self._known[resource].values()]
+
+    def poll(self):
+        """Retrieve the tournament's lists and report the changes.
+
+        :return
+            the list of Events, which were also passed to the callbacks
+        """
+        events = []
+        for resource in self.resources:
+            response = self.client.fetch("GET", "tournaments/%s/%s" % (self.tournament, resource))
+            if response is self._responses.get(resource):
+                continue  # served unchanged from the response cache
+            self._responses[resource] = response
+            events.extend(self._diff(resource, api._decode(response) or []))
+
+        for event in events:
+            for callback in self._callbacks:
+                callback(event)
+        return events
+
+    def _diff(self, resource, data):
+        known = self._known[resource]
+        seen = set()
+        events = []
+        for item in data:
+            [(name, fields)] = item.items()
+            record_id = fields["id"]
+            seen.add(record_id)
+            updated_at = fields.get("updated_at") or dict(fields)
+            last = known.get(record_id)
+            if last is not None and last[0] == updated_at:
+                continue
+
+            record = self.client._parse(item)
+            known[record_id] = updated_at, record
+            if last is None:
+                events.append(Event(ADDED, resource, record_id, record, None))
+            else:
+                events.append(Event(CHANGED, resource, record_id, record, last[1]))
+
+        for record_id in set(known) - seen:
+            _, record = known.pop(record_id)
+            events.append(Event(REMOVED, resource, record_id, record, None))
+
+        return events
@@ -0,0 +1,134 @@
+"""Client-side rate limiting and retries of failed requests."""
+import random
+import threading
+import time
+
+
+class RateLimiter(object):
+    """A token bucket shared by all the threads sending requests.
+
+    Up to `burst` requests can be sent at once, after which requests are
+    spread to `rate` per second. pause() stops all the requests for a
+    while, ex. when challonge.com asks to slow down with a 429 response.
+
+    :param rate: the sustained number of requests per second
+    :keyword param burst: the size of the bucket, defaults to rate
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst if burst is not None else rate))
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, waiting until one is available.
+
+        :return
+            the seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.time()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        """Stop handing out tokens for the given seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+            self._tokens = 0.0
+
+
+class RetryPolicy(object):
+    """When and how long to wait before sending a failed request again.
+
+    Requests answered with 429 Too Many Requests are always retried,
+    since the server did not process them. Server errors and connection
+    errors are retried only for the idempotent `methods`. The waits grow
+    exponentially with full jitter, unless the response has a
+    Retry-After header, which is respected.
+
+    A request is not retried if the wait would take it past
+    `max_elapsed` seconds since its first attempt.
+
+    :keyword param max_retries: the maximum retries of a request
+    :keyword param backoff: the base wait in seconds
+    :keyword param max_backoff: the maximum wait between two attempts
+    :keyword param max_elapsed: the time budget of a request in seconds,
+        None for no limit
+    :keyword param statuses: the retried server error status codes
+    :keyword param methods: the methods that are safe to retry
+    """
+
+    def __init__(
+        self,
+        max_retries=3,
+        backoff=0.5,
+        max_backoff=30.0,
+        max_elapsed=60.0,
+        statuses=(500, 502, 503, 504),
+        methods=("GET", "PUT", "DELETE"),
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+
+    def next_wait(self, method, status, retries, started, retry_after=None):
+        """Return the seconds to wait before sending a request again.
+
+        :param method: the HTTP method of the request
+        :param status: the status code of the response or None
+            for a connection error
+        :param retries: the retries made so far
+        :param started: the time of the first attempt
+        :param retry_after: the seconds asked by the Retry-After header
+
+        :return
+            None if the request should not be retried
+        """
+        if retries >= self.max_retries:
+            return None
+        if status != 429 and not (
+            method in self.methods and (status is None or status in self.statuses)
+        ):
+            return None
+
+        if retry_after is not None:
+            wait = retry_after
+        else:
+            wait = random.uniform(0, min(self.max_backoff, self.backoff * 2**retries))
+        if self.max_elapsed is not None and time.time() + wait - started > self.max_elapsed:
+            return None
+        return wait
+
+
+def retry_after(response):
+    """Return the seconds of the Retry-After header of a response or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        import email.utils
+
+        date = email.utils.parsedate_tz(value)
+        if date is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(date) - time.time())
@@ -1,100 +1,242 @@
+import datetime
+from collections import namedtuple
 from challonge import api
+from challonge.cache import _identifiers
 
 
-def index(**params):
-    """Retrieve a set of tournaments created with your account."""
-    return api.fetch_and_parse("GET", "tournaments", **params)
+Snapshot = namedtuple("Snapshot", ["tournament", "participants", "matches"])
 
+_DAY = datetime.timedelta(days=1)
 
-def create(name, url, tournament_type="single elimination", **params):
-    """Create a new tournament."""
-    params.update(
-        {
-            "name": name,
-            "url": url,
-            "tournament_type": tournament_type,
-        }
-    )
 
-    return api.fetch_and_parse("POST", "tournaments", "tournament", **params)
+def _date(value):
+    """Return the date of a date, a datetime or an ISO 8601 string."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    elif isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
 
 
-def show(tournament, **params):
-    """Retrieve a single tournament record created with your account."""
-    return api.fetch_and_parse("GET", "tournaments/%s" % tournament, **params)
-
-
-def update(tournament, **params):
-    """Update a tournament's attributes."""
-    api.fetch("PUT", "tournaments/%s" % tournament, "tournament", **params)
-
-
-def destroy(tournament):
-    """Deletes a tournament along with all its associated records.
-
-    There is no undo, so use with care!
+class Tournaments(object):
+    """The tournaments operations of a challonge.api.Challonge client.
 
+    The functions of this module are the operations of the default client.
     """
-    api.fetch("DELETE", "tournaments/%s" % tournament)
-
-
-def process_check_ins(tournament, **params):
-    """This should be invoked after a tournament's
-    check-in window closes before the tournament is started.
-
-    1) Marks participants who have not checked in as inactive.
-    2) Moves inactive participants to bottom seeds (ordered by original seed).
-    3) Transitions the tournament state from 'checking_in' to 'checked_in'
-
-    """
-    return api.fetch_and_parse("POST", "tournaments/%s/process_check_ins" % tournament, **params)
-
-
-def abort_check_in(tournament, **params):
-    """When your tournament is in a 'checking_in' or 'checked_in' state,
-    there's no way to edit the tournament's start time (start_at)
-    or check-in duration (check_in_duration).
-    You must first abort check-in, then you may edit those attributes.
-
-    1) Makes all participants active and clears their checked_in_at times.
-    2) Transitions the tournament state from 'checking_in' or 'checked_in' to 'pending'
-
-    """
-    return api.fetch_and_parse("POST", "tournaments/%s/abort_check_in" % tournament, **params)
-
-
-def open_for_predictions(tournament, **params):
-    """Open predictions for a tournament
 
-    Sets the state of the tournament to start accepting predictions.
-    'prediction_method' must be set to 1 (exponential scoring) or 2 (linear scoring) to use this option.
-
-    """
-    return api.fetch_and_parse("POST", "tournaments/%s/open_for_predictions" % tournament, **params)
-
-
-def start(tournament, **params):
-    """Start a tournament, opening up matches for score reporting.
-
-    The tournament must have at least 2 participants.
-
-    """
-    return api.fetch_and_parse("POST", "tournaments/%s/start" % tournament, **params)
-
-
-def finalize(tournament, **params):
-    """Finalize a tournament that has had all match scores submitted,
-    rendering its results permanent.
-
-    """
-    return api.fetch_and_parse("POST", "tournaments/%s/finalize" % tournament, **params)
-
-
-def reset(tournament, **params):
-    """Reset a tournament, clearing all of its scores and attachments.
-
-    You can then add/remove/edit participants before starting the
-    tournament again.
-
-    """
-    return api.fetch_and_parse("POST", "tournaments/%s/reset" % tournament, **params)
+    def __init__(self, client):
+        self._client = client
+
+    def index(self, **params):
+        """Retrieve a set of tournaments created with your account."""
+        return self._client.fetch_and_parse("GET", "tournaments", **params)
+
+    def iter_index(self, **params):
+        """Iterate over the tournaments created with your account.
+
+        Unlike index() the tournaments are parsed one at a time while the
+        response is downloaded, so large accounts need little memory.
+
+        """
+        return self._client.fetch_and_iter("GET", "tournaments", **params)
+
+    def scan(self, created_after=None, created_before=None, window=30, **params):
+        """Iterate over the tournaments created with your account, by date windows.
+
+        The query is split into windows of `window` days, from
+        created_before (or today) back to created_after. A window is
+        requested only once the tournaments of the previous one have been
+        consumed, so a caller which stops early does not download the
+        others. The windows overlap by a day, whichever way challonge.com
+        treats the bounds, and a tournament of two windows is yielded once.
+        Without created_after the scan stops at the first empty window,
+        with one request for all the older tournaments.
+
+        The other parameters, ex. state or type, are sent with every window.
+
+        :param created_after: the oldest creation date, a date or "YYYY-MM-DD"
+        :param created_before: the newest creation date
+        :param window: the days of each window, at least 1
+        :type window: int
+        :rtype: generator of tournaments, newest window first
+
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1 day, not %r" % (window,))
+        return self._scan(created_after, created_before, window, params)
+
+    def _scan(self, created_after, created_before, window, params):
+        after = None if created_after is None else _date(created_after)
+        end = datetime.date.today() if created_before is None else _date(created_before)
+        before = created_before
+        # the ids of the last two windows, the only ones a window can overlap
+        recent = (set(), set())
+        while True:
+            start = end - datetime.timedelta(days=window - 1)
+            last = after is not None and start <= after
+            query = dict(params)
+            if before is not None:
+                query["created_before"] = before
+            query["created_after"] = created_after if last else start - _DAY
+
+            current = set()
+            for t in self.iter_index(**query):
+                current.add(t["id"])
+                if t["id"] not in recent[0] and t["id"] not in recent[1]:
+                    yield t
+            if last:
+                return
+
+            before = start
+            end = start - _DAY
+            if not current and after is None:
+                for t in self.iter_index(created_before=before, **params):
+                    if t["id"] not in recent[1]:
+                        yield t
+                return
+            recent = (recent[1], current)
+
+    def create(self, name, url, tournament_type="single elimination", **params):
+        """Create a new tournament."""
+        params.update(
+            {
+                "name": name,
+                "url": url,
+                "tournament_type": tournament_type,
+            }
+        )
+
+        return self._client.fetch_and_parse("POST", "tournaments", "tournament", **params)
+
+    def show(self, tournament, **params):
+        """Retrieve a single tournament record created with your account."""
+        return self._client.fetch_and_parse("GET", "tournaments/%s" % tournament, **params)
+
+    def snapshot(self, tournament, **params):
+        """Retrieve a tournament with its participants and matches in one request.
+
+        If the response cache is enabled (see api.configure_cache) the
+        participant and match lists are also cached, so participants.index()
+        and matches.index() for the tournament are served from memory
+        for the ttl of the cache.
+
+        :param tournament: the tournament's name or id
+        :type tournament: int or string
+        :return: the parsed tournament, participants and matches
+        :rtype: Snapshot
+
+        """
+        params.update({"include_participants": True, "include_matches": True})
+        response = self._client.fetch("GET", "tournaments/%s" % tournament, **params)
+
+        data = dict(api._decode(response)["tournament"])
+        participants = data.pop("participants", None) or []
+        matches = data.pop("matches", None) or []
+
+        # the cache learns the identifiers of the tournament first, so a
+        # change made with any of them drops the seeded lists
+        self._client._learn("GET", "tournaments/%s" % tournament, {"tournament": data})
+        if data.get("id") is not None:
+            for t in _identifiers(tournament, data):
+                self._client._seed_cache("tournaments/%s/participants" % t, participants)
+                self._client._seed_cache("tournaments/%s/matches" % t, matches)
+
+        return Snapshot(
+            self._client._parse({"tournament": data}),
+            self._client._parse(participants),
+            self._client._parse(matches),
+        )
+
+    def update(self, tournament, **params):
+        """Update a tournament's attributes."""
+        self._client.fetch("PUT", "tournaments/%s" % tournament, "tournament", **params)
+
+    def destroy(self, tournament):
+        """Deletes a tournament along with all its associated records.
+
+        There is no undo, so use with care!
+
+        """
+        self._client.fetch("DELETE", "tournaments/%s" % tournament)
+
+    def process_check_ins(self, tournament, **params):
+        """This should be invoked after a tournament's
+        check-in window closes before the tournament is started.
+
+        1) Marks participants who have not checked in as inactive.
+        2) Moves inactive participants to bottom seeds (ordered by original seed).
+        3) Transitions the tournament state from 'checking_in' to 'checked_in'
+
+        """
+        return self._client.fetch_and_parse(
+            "POST", "tournaments/%s/process_check_ins" % tournament, **params
+        )
+
+    def abort_check_in(self, tournament, **params):
+        """When your tournament is in a 'checking_in' or 'checked_in' state,
+        there's no way to edit the tournament's start time (start_at)
+        or check-in duration (check_in_duration).
+        You must first abort check-in, then you may edit those attributes.
+
+        1) Makes all participants active and clears their checked_in_at times.
+        2) Transitions the tournament state from 'checking_in' or 'checked_in' to 'pending'
+
+        """
+        return self._client.fetch_and_parse(
+            "POST", "tournaments/%s/abort_check_in" % tournament, **params
+        )
+
+    def open_for_predictions(self, tournament, **params):
+        """Open predictions for a tournament
+
+        Sets the state of the tournament to start accepting predictions.
+        'prediction_method' must be set to 1 (exponential scoring) or 2 (linear scoring) to use this option.
+
+        """
+        return self._client.fetch_and_parse(
+            "POST", "tournaments/%s/open_for_predictions" % tournament, **params
+        )
+
+    def start(self, tournament, **params):
+        """Start a tournament, opening up matches for score reporting.
+
+        The tournament must have at least 2 participants.
+
+        """
+        return self._client.fetch_and_parse("POST", "tournaments/%s/start" % tournament, **params)
+
+    def finalize(self, tournament, **params):
+        """Finalize a tournament that has had all match scores submitted,
+        rendering its results permanent.
+
+        """
+        return self._client.fetch_and_parse(
+            "POST", "tournaments/%s/finalize" % tournament, **params
+        )
+
+    def reset(self, tournament, **params):
+        """Reset a tournament, clearing all of its scores and attachments.
+
+        You can then add/remove/edit participants before starting the
+        tournament again.
+
+        """
+        return self._client.fetch_and_parse("POST", "tournaments/%s/reset" % tournament, **params)
+
+
+_default = api.get_client().tournaments
+
+index = _default.index
+iter_index = _default.iter_index
+scan = _default.scan
+create = _default.create
+show = _default.show
+snapshot = _default.snapshot
+update = _default.update
+destroy = _default.destroy
+process_check_ins = _default.process_check_ins
+abort_check_in = _default.abort_check_in
+open_for_predictions = _default.open_for_predictions
+start = _default.start
+finalize = _default.finalize
+reset = _default.reset
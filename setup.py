@@ -36,5 +36,9 @@ setup(
         "tzlocal>=2.0.0,<3.0",
         "pytz==2019.3",
         "requests>=2.25.1,<3.0",
+        'futures>=3.0; python_version < "3.0"',
     ],
+    extras_require={
+        "aio": ["aiohttp>=3.6"],
+    },
 )
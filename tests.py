@@ -1,15 +1,45 @@
 import datetime
+import json
+import math
+import pytz
 import tzlocal
 import os
+import pickle
 import random
 import string
+import subprocess
+import tempfile
+import sys
+import time
 import requests
 import unittest
 import challonge
+import challonge.batch
+import challonge.bracket
+import challonge.columns
+import challonge.fake
+import challonge.metrics
+import challonge.scheduler
+import challonge.store
+import challonge.sync
+import challonge.throttle
+
+try:
+    import asyncio
+    from challonge import aio
+except (ImportError, SyntaxError):
+    aio = None
 
 
 username = None
 api_key = None
+# with CHALLONGE_FAKE set the tests run against challonge.fake
+live_pool = challonge.fake.FakeChallonge() if os.environ.get("CHALLONGE_FAKE") else None
+
+
+def _connect():
+    challonge.set_credentials(username, api_key)
+    challonge.api.set_pool(live_pool)
 
 
 def _get_random_name():
@@ -39,13 +69,1219 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(str(tz), test_tz)
 
     def test_call(self):
-        challonge.set_credentials(username, api_key)
+        _connect()
         self.assertNotEqual(challonge.fetch("GET", "tournaments"), "")
 
 
+class ImportTestCase(unittest.TestCase):
+    def test_lazy_imports(self):
+        # `import challonge` must stay fast, see benchmarks/import_time.py
+        code = (
+            "import sys, challonge; "
+            "print(' '.join(m for m in ('requests', 'iso8601', 'pytz', 'tzlocal') "
+            "if m in sys.modules))"
+        )
+        cwd = os.path.dirname(os.path.abspath(__file__))
+        out = subprocess.check_output([sys.executable, "-c", code], cwd=cwd)
+        self.assertEqual(out.strip(), b"")
+
+
+class ParseTestCase(unittest.TestCase):
+    def setUp(self):
+        challonge.set_timezone("UTC")
+
+    def tearDown(self):
+        challonge.set_timezone()
+        challonge.set_datetime_type()
+
+    def test_parse_by_schema(self):
+        t = challonge.api._parse(
+            _json(
+                {
+                    "tournament": {
+                        "id": 1,
+                        "url": "2020",
+                        "state": "pending",
+                        "pts_for_match_win": "1.0",
+                        "created_at": "2021-03-28T12:00:00.000-04:00",
+                        "started_at": None,
+                    }
+                }
+            )
+        )
+        self.assertEqual(t["url"], "2020")
+        self.assertEqual(t["state"], "pending")
+        self.assertEqual(t["pts_for_match_win"], 1.0)
+        self.assertEqual(t["created_at"], datetime.datetime(2021, 3, 28, 16, tzinfo=pytz.utc))
+        self.assertIsNone(t["started_at"])
+
+    def test_parse_keeps_text_fields(self):
+        m = {"match": {"scores_csv": "3", "prerequisite_match_ids_csv": "7"}}
+        ms = challonge.api._parse(_json([m]))
+        self.assertEqual(ms, [{"scores_csv": "3", "prerequisite_match_ids_csv": "7"}])
+
+    def test_parse_unknown_fields(self):
+        p = challonge.api._parse(
+            _json({"participant": {"new_number": "2.5", "new_date": "2021-03-28", "misc": "1"}})
+        )
+        self.assertEqual(p["new_number"], 2.5)
+        self.assertIsInstance(p["new_date"], datetime.datetime)
+        self.assertEqual(p["misc"], "1")
+
+    def test_datetime_types(self):
+        value = "2021-03-28T12:00:00.500-04:00"
+        m = _json({"match": {"started_at": value, "new_date": value}})
+        expected = {
+            "utc": datetime.datetime(2021, 3, 28, 16, 0, 0, 500000, tzinfo=pytz.utc),
+            "epoch": 1616947200.5,
+            "iso": value,
+        }
+        for datetime_type, dt in expected.items():
+            challonge.set_datetime_type(datetime_type)
+            self.assertEqual(challonge.api._parse(m), {"started_at": dt, "new_date": dt})
+
+        challonge.set_timezone("Asia/Seoul")
+        challonge.set_datetime_type("local")
+        started_at = challonge.api._parse(m)["started_at"]
+        self.assertEqual(started_at.utcoffset(), datetime.timedelta(hours=9))
+        self.assertEqual(started_at, expected["utc"])
+        self.assertRaises(ValueError, challonge.set_datetime_type, "naive")
+
+
+class JsonBackendTestCase(unittest.TestCase):
+    def tearDown(self):
+        challonge.set_json_backend()
+
+    def test_backends(self):
+        expected = json.loads('[{"match": {"id": 1, "identifier": "\\u00c9"}}]')
+        # the body is sent as utf-8, not as json escapes
+        response = _response(200, json.dumps(expected, ensure_ascii=False))
+        response.encoding = None
+        for backend in ("json", "auto"):
+            challonge.set_json_backend(backend)
+            self.assertEqual(challonge.api._decode(response), expected)
+        self.assertIn(challonge.get_json_backend(), ("json", "orjson"))
+        self.assertRaises(ValueError, challonge.set_json_backend, "yaml")
+
+    def test_loads_text(self):
+        # the json backend of Python 3.4 and 3.5
+        body = '{"name": "\\u00c9 \\u00e9"}'
+        expected = json.loads(body)
+        self.assertEqual(challonge.api._loads_text(body.encode("utf-8")), expected)
+        self.assertEqual(challonge.api._loads_text(body), expected)
+        raw = b'{"name": "\xc3\x89"}'
+        self.assertEqual(challonge.api._loads_text(raw), {"name": expected["name"][0]})
+
+
+class LazyRecordTestCase(unittest.TestCase):
+    def setUp(self):
+        challonge.set_record_type("lazy")
+
+    def tearDown(self):
+        challonge.set_record_type()
+
+    def test_convert_on_access(self):
+        data = _json([{"match": {"id": 1, "state": "open", "created_at": "2021-03-28T12:00:00Z"}}])
+        eager = challonge.api._parse([{"match": dict(data[0]["match"])}])[0]
+        m = challonge.api._parse(data)[0]
+
+        self.assertIsInstance(m, challonge.records.LazyRecord)
+        self.assertEqual(m._converted, set())
+        self.assertIsInstance(m["created_at"], datetime.datetime)
+        self.assertIs(m["created_at"], m["created_at"])
+        self.assertEqual(m, eager)
+        self.assertEqual(m.to_dict(), eager)
+
+    def test_mutable(self):
+        m = challonge.api._parse({"participant": {"id": 1, "misc": "a"}})
+        m["misc"] = "b"
+        self.assertEqual(m.pop("misc"), "b")
+        self.assertEqual(dict(m), {"id": 1})
+
+    def test_invalid_record_type(self):
+        self.assertRaises(ValueError, challonge.set_record_type, "list")
+
+
+class RecordTestCase(unittest.TestCase):
+    def setUp(self):
+        challonge.set_record_type("record")
+
+    def tearDown(self):
+        challonge.set_record_type()
+
+    def test_record(self):
+        data = {"match": {"id": 1, "state": "open", "new_field": "x", "created_at": None}}
+        m = challonge.api._parse(data)
+
+        self.assertIsInstance(m, challonge.records.Match)
+        if sys.version_info[0] > 2:
+            self.assertFalse(hasattr(m, "__dict__"))
+        self.assertEqual(m.state, "open")
+        self.assertEqual(m["state"], "open")
+        self.assertEqual(m.new_field, "x")
+        self.assertIsNone(m.get("created_at", 1))
+        self.assertNotIn("player1_id", m)
+        self.assertRaises(KeyError, lambda: m["player1_id"])
+        self.assertRaises(AttributeError, lambda: m.player1_id)
+        self.assertEqual(m, {"id": 1, "state": "open", "new_field": "x", "created_at": None})
+
+    def test_same_as_dict(self):
+        data = _json(
+            {
+                "match": {
+                    "id": 1,
+                    "scores_csv": "3-1",
+                    "started_at": "2015-01-19T16:57:17-05:00",
+                    "new_at": "2015-01-19T16:57:17-05:00",
+                    "new_rating": "1.5",
+                }
+            }
+        )
+        m = challonge.api._parse(data)
+        challonge.set_record_type()
+        self.assertEqual(m.to_dict(), challonge.api._parse(data))
+        self.assertIsInstance(m.started_at, datetime.datetime)
+        self.assertEqual(m.new_rating, 1.5)
+
+    def test_pickle(self):
+        p = challonge.api._parse({"participant": {"id": 1, "name": "p1"}})
+        self.assertEqual(pickle.loads(pickle.dumps(p)), p)
+
+
+class ColumnsTestCase(unittest.TestCase):
+    matches = [
+        {
+            "match": {
+                "id": 1,
+                "tournament_id": 10,
+                "round": -1,
+                "player1_id": 5,
+                "player2_id": 6,
+                "winner_id": 6,
+                "loser_id": 5,
+                "scores_csv": "1-3,-1-2",
+                "completed_at": "1970-01-01T01:00:01.500+01:00",
+            }
+        },
+        {"match": {"id": 2, "tournament_id": 10, "round": 2, "player1_id": None}},
+    ]
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+
+    def test_from_json(self):
+        table = challonge.columns.Columns.from_json("match", self.matches)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(list(table["round"]), [-1, 2])
+        self.assertEqual(list(table["player1_id"]), [5, challonge.columns.MISSING])
+        self.assertEqual((table["player1_score"][0], table["player2_score"][0]), (0, 5))
+        self.assertEqual(table["player2_score"][1], challonge.columns.MISSING)
+        self.assertEqual(table["completed_at"][0], 1.5)
+        self.assertTrue(math.isnan(table["completed_at"][1]))
+        self.assertEqual(table.row(0)["winner_id"], 6)
+
+    def test_missing_values(self):
+        table = challonge.columns.Columns.from_json(
+            "match",
+            [
+                {"match": {"id": 1, "round": -1, "scores_csv": "-1-3"}},
+                {"match": {"id": 2, "round": None, "scores_csv": ""}},
+            ],
+        )
+        missing = challonge.columns.MISSING
+        self.assertEqual(list(table["round"]), [-1, missing])
+        self.assertEqual(list(table["player1_score"]), [-1, missing])
+
+        self.assertRaises(ValueError, table.extend_json, [{"match": {"id": 3, "round": "x"}}])
+        self.assertEqual(set(len(column) for column in table.columns.values()), set([2]))
+
+    def test_resource_columns(self):
+        body = json.dumps(self.matches)
+        challonge.api.set_pool(_StubPool(lambda method, url, kwargs: _response(200, body)))
+        table = challonge.matches.columns(10)
+        table.extend(challonge.matches.columns(11))
+        self.assertEqual(list(table["id"]), [1, 2, 1, 2])
+
+        challonge.api.set_pool(
+            _StubPool(lambda method, url, kwargs: _response(200, '[{"participant": {"id": 3}}]'))
+        )
+        participants = challonge.participants.columns(10)
+        self.assertEqual(list(participants["id"]), [3])
+        self.assertEqual(participants["active"][0], challonge.columns.MISSING_BOOL)
+        self.assertRaises(ValueError, table.extend, participants)
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    def tearDown(self):
+        challonge.configure_pool()
+
+    def test_get_pool_is_shared(self):
+        self.assertIs(challonge.api.get_pool(), challonge.api.get_pool())
+
+    def test_configure_pool(self):
+        old = challonge.api.get_pool()
+        old._get_session()
+        pool = challonge.configure_pool(pool_size=3, timeout=5, keep_alive=False)
+
+        self.assertIs(challonge.api.get_pool(), pool)
+        self.assertEqual(pool.pool_size, 3)
+        self.assertEqual(pool.timeout, 5)
+        self.assertFalse(pool.keep_alive)
+        self.assertIsNone(old._session)
+
+    def test_close_and_reuse(self):
+        with challonge.api.ConnectionPool(pool_size=2) as pool:
+            session = pool._get_session()
+            self.assertIs(session, pool._get_session())
+            adapter = session.get_adapter("https://api.challonge.com")
+            self.assertEqual(adapter._pool_maxsize, 2)
+
+        self.assertIsNone(pool._session)
+        self.assertIsNot(pool._get_session(), session)
+        pool.close()
+
+    def test_no_cookies(self):
+        class Headers(object):
+            def get_all(self, name, default=None):
+                return ["session=1; Path=/"] if name == "Set-Cookie" else []
+
+            def getheaders(self, name):  # Python 2
+                return self.get_all(name)
+
+        with challonge.api.ConnectionPool() as pool:
+            cookies = pool._get_session().cookies
+            url = "https://api.challonge.com/v1/tournaments.json"
+            request = requests.cookies.MockRequest(requests.Request("GET", url).prepare())
+            cookies.extract_cookies(requests.cookies.MockResponse(Headers()), request)
+            self.assertEqual(len(cookies), 0)
+
+
+def _response(status, body, headers=None):
+    response = requests.models.Response()
+    response.status_code = status
+    response.reason = "Stub"
+    response.url = "https://api.challonge.com/v1/stub.json"
+    response.encoding = "utf-8"
+    response.headers.update(headers or {})
+    response._content = body.encode("utf-8")
+    response._content_consumed = True
+    return response
+
+
+def _json(data):
+    """Return data as decoded from a response, with unicode strings on Python 2."""
+    return json.loads(json.dumps(data))
+
+
+class _StubPool(object):
+    """Answer the requests of challonge.api with handler(method, url, kwargs)."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.handler(method, url, kwargs)
+
+    def close(self):
+        pass
+
+
+class BatchTestCase(unittest.TestCase):
+    def tearDown(self):
+        challonge.api.set_pool(None)
+
+    def test_run_many(self):
+        def func(x):
+            if x == 3:
+                raise ValueError(x)
+            return x * 2
+
+        res = challonge.batch.run_many(func, [1, 2, 3], max_workers=2)
+        self.assertEqual(res, {1: 2, 2: 4})
+        self.assertIsInstance(res.errors[3], ValueError)
+        self.assertFalse(res.ok)
+
+    def test_matches_index_many(self):
+        def handler(method, url, kwargs):
+            if "/tournaments/bad/" in url:
+                return _response(404, "")
+            return _response(200, '[{"match": {"id": 1, "round": 1}}]')
+
+        challonge.api.set_pool(_StubPool(handler))
+        res = challonge.matches.index_many(["a", "b", "bad"], state="open")
+
+        self.assertEqual(sorted(res), ["a", "b"])
+        self.assertEqual(res["a"], [{"id": 1, "round": 1}])
+        self.assertIsInstance(res.errors["bad"], requests.HTTPError)
+
+
+class StreamTestCase(unittest.TestCase):
+    def tearDown(self):
+        challonge.api.set_pool(None)
+        challonge.api.STREAM_CHUNK_SIZE = 64 * 1024
+
+    def test_iter_json_chunks(self):
+        data = [{"match": {"id": i, "scores_csv": "1-0,]" * i}} for i in range(20)]
+        body = json.dumps(data).encode("utf-8")
+        for size in (1, 7, len(body)):
+            chunks = [body[i : i + size] for i in range(0, len(body), size)]
+            self.assertEqual(list(challonge.api._iter_json(chunks)), data)
+
+    def test_iter_json_numbers(self):
+        data = [1, 23, 456, -7.5e3, 1.2e-06, True, None, {"a": 89}, "10"]
+        body = json.dumps(data).encode("utf-8")
+        for size in range(1, len(body) + 1):
+            chunks = [body[i : i + size] for i in range(0, len(body), size)]
+            self.assertEqual(list(challonge.api._iter_json(chunks)), data)
+
+    def test_iter_index(self):
+        challonge.api.STREAM_CHUNK_SIZE = 16
+        body = '[{"match": {"id": 1, "round": 1}}, {"match": {"id": 2, "round": 2}}]'
+        pool = _StubPool(lambda method, url, kwargs: _response(200, body))
+        challonge.api.set_pool(pool)
+
+        ms = challonge.matches.iter_index(1)
+        self.assertEqual(pool.calls, [])
+        self.assertEqual(list(ms), [{"id": 1, "round": 1}, {"id": 2, "round": 2}])
+        self.assertTrue(pool.calls[0][2]["stream"])
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = "pending"
+
+        def handler(method, url, kwargs):
+            if method != "GET":
+                self.state = "underway"
+                return _response(200, "{}")
+            if url.endswith("/tournaments.json"):
+                body = json.dumps([{"tournament": {"id": 1, "state": self.state}}])
+            else:
+                t = int(url.rsplit("/", 1)[1].split(".")[0])
+                body = json.dumps({"tournament": {"id": t, "state": self.state}})
+            etag = '"%s"' % hash(body)
+            if kwargs["headers"].get("If-None-Match") == etag:
+                return _response(304, "")
+            return _response(200, body, {"ETag": etag})
+
+        self.pool = _StubPool(handler)
+        challonge.api.set_pool(self.pool)
+        self.cache = challonge.configure_cache(maxsize=2)
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+        challonge.api.set_cache(None)
+
+    def test_revalidate(self):
+        t1 = challonge.tournaments.show(1)
+        t2 = challonge.tournaments.show(1)
+
+        self.assertEqual(t1, t2)
+        self.assertEqual(len(self.pool.calls), 2)
+        self.assertNotIn("If-None-Match", self.pool.calls[0][2]["headers"])
+        self.assertIn("If-None-Match", self.pool.calls[1][2]["headers"])
+
+    def test_ttl(self):
+        self.cache.ttl = 60
+        challonge.tournaments.show(1)
+        challonge.tournaments.show(1)
+        self.assertEqual(len(self.pool.calls), 1)
+
+    def test_invalidate_on_change(self):
+        self.cache.ttl = 60
+        challonge.tournaments.show(1)
+        challonge.tournaments.index()
+        challonge.tournaments.show(2)
+        challonge.tournaments.start(1)
+
+        self.assertEqual(list(self.cache._entries), [("tournaments/2", ())])
+        self.assertEqual(challonge.tournaments.show(1)["state"], "underway")
+
+    def test_invalidate_aliases(self):
+        challonge.api.set_pool(challonge.fake.FakeChallonge(seed=1))
+        self.cache = challonge.configure_cache(ttl=60)
+        t = challonge.tournaments.create("t", "myurl")
+        challonge.participants.bulk_add(t["id"], ["a", "b"])
+        challonge.tournaments.start(t["id"])
+        other = challonge.tournaments.create("other", "other")
+
+        [m] = challonge.matches.index("myurl")
+        challonge.tournaments.show("myurl")
+        challonge.tournaments.show(other["id"])
+        challonge.matches.update(t["id"], m["id"], winner_id=m["player1_id"])
+        self.assertEqual(challonge.matches.index("myurl")[0]["state"], "complete")
+        self.assertIn(("tournaments/%s" % other["id"], ()), self.cache._entries)
+
+    def test_lru(self):
+        for t in (1, 2, 1, 3):
+            challonge.tournaments.show(t)
+        keys = [k[0] for k in self.cache._entries]
+        self.assertEqual(keys, ["tournaments/1", "tournaments/3"])
+
+
+class CoalescingTestCase(unittest.TestCase):
+    def setUp(self):
+        challonge.set_coalescing()
+
+    def tearDown(self):
+        challonge.set_coalescing(False)
+        challonge.api.set_pool(None)
+
+    def _index_concurrently(self, status, body):
+        def handler(method, url, kwargs):
+            time.sleep(0.1)
+            return _response(status, body)
+
+        pool = _StubPool(handler)
+        challonge.api.set_pool(pool)
+        res = challonge.batch.run_many(
+            lambda i: challonge.matches.index(1, state="open"), range(8), max_workers=8
+        )
+        return pool, res
+
+    def test_shared_response(self):
+        pool, res = self._index_concurrently(200, '[{"match": {"id": 1}}]')
+        self.assertEqual(len(pool.calls), 1)
+        self.assertEqual(list(res.values()), [[{"id": 1}]] * 8)
+        # each caller parses its own records
+        self.assertEqual(len(set(id(ms[0]) for ms in res.values())), 8)
+
+    def test_shared_error(self):
+        pool, res = self._index_concurrently(404, "")
+        self.assertEqual(len(pool.calls), 1)
+        self.assertEqual(len(res.errors), 8)
+        self.assertIsInstance(res.errors[0], requests.HTTPError)
+
+    def test_disabled(self):
+        challonge.set_coalescing(False)
+        pool, res = self._index_concurrently(200, "[]")
+        self.assertEqual(len(pool.calls), 8)
+
+
+class SnapshotTestCase(unittest.TestCase):
+    body = json.dumps(
+        {
+            "tournament": {
+                "id": 1,
+                "url": "t1",
+                "state": "underway",
+                "participants": [{"participant": {"id": 10, "name": "p1"}}],
+                "matches": [{"match": {"id": 100, "player1_id": 10, "player2_id": None}}],
+            }
+        }
+    )
+
+    def setUp(self):
+        self.pool = _StubPool(lambda method, url, kwargs: _response(200, self.body))
+        challonge.api.set_pool(self.pool)
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+        challonge.api.set_cache(None)
+
+    def test_snapshot(self):
+        s = challonge.tournaments.snapshot("t1")
+
+        self.assertEqual(s.tournament, {"id": 1, "url": "t1", "state": "underway"})
+        self.assertEqual(s.participants, [{"id": 10, "name": "p1"}])
+        self.assertEqual(s.matches, [{"id": 100, "player1_id": 10, "player2_id": None}])
+        params = self.pool.calls[0][2]["params"]
+        self.assertIn(("include_participants", "true"), params)
+        self.assertIn(("include_matches", "true"), params)
+
+    def test_snapshot_seeds_cache(self):
+        challonge.configure_cache(ttl=60)
+        s = challonge.tournaments.snapshot("t1")
+
+        self.assertEqual(challonge.matches.index(1), s.matches)
+        self.assertEqual(challonge.participants.index("t1"), s.participants)
+        self.assertEqual(len(self.pool.calls), 1)
+
+    def test_snapshot_seeds_invalidated(self):
+        challonge.api.set_pool(challonge.fake.FakeChallonge(seed=1))
+        challonge.configure_cache(ttl=60)
+        t = challonge.tournaments.create("t", "myurl")
+        challonge.participants.bulk_add(t["id"], ["a", "b"])
+        challonge.tournaments.start(t["id"])
+        other = challonge.tournaments.create("other", "other")
+        challonge.tournaments.show(other["id"])
+
+        [m] = challonge.tournaments.snapshot("myurl").matches
+        challonge.matches.update(t["id"], m["id"], winner_id=m["player1_id"])
+        cached = challonge.api.get_cache()._entries
+        self.assertIn(("tournaments/%s" % other["id"], ()), cached)
+        self.assertEqual(challonge.matches.index("myurl")[0]["state"], "complete")
+        self.assertEqual(challonge.matches.index(t["id"])[0]["state"], "complete")
+
+
+class ThrottleTestCase(unittest.TestCase):
+    def tearDown(self):
+        challonge.api.set_pool(None)
+        challonge.api.set_rate_limiter(None)
+        challonge.api.set_retry_policy(None)
+
+    def _stub(self, *responses):
+        responses = list(responses)
+        pool = _StubPool(lambda method, url, kwargs: responses.pop(0))
+        challonge.api.set_pool(pool)
+        return pool
+
+    def test_rate_limiter(self):
+        limiter = challonge.throttle.RateLimiter(100, burst=2)
+        waited = [limiter.acquire() for _ in range(4)]
+        self.assertEqual(waited[:2], [0, 0])
+        self.assertTrue(all(w > 0 for w in waited[2:]))
+
+    def test_retry_after(self):
+        r = _response(429, "", {"Retry-After": "0"})
+        self.assertEqual(challonge.throttle.retry_after(r), 0)
+        r = _response(429, "", {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        self.assertEqual(challonge.throttle.retry_after(r), 0)
+        self.assertIsNone(challonge.throttle.retry_after(_response(429, "")))
+
+    def test_retry(self):
+        challonge.configure_retries(backoff=0.001)
+        pool = self._stub(
+            _response(503, ""), _response(429, "", {"Retry-After": "0"}), _response(200, "[]")
+        )
+
+        self.assertEqual(challonge.matches.index(1), [])
+        self.assertEqual(len(pool.calls), 3)
+
+    def test_no_retry(self):
+        challonge.configure_retries(max_retries=1, backoff=0.001)
+        self._stub(_response(503, ""), _response(503, ""))
+        self.assertRaises(requests.HTTPError, challonge.matches.index, 1)
+
+        # POST requests are retried only when throttled
+        pool = self._stub(_response(500, ""))
+        self.assertRaises(requests.HTTPError, challonge.matches.reopen, 1, 1)
+        self.assertEqual(len(pool.calls), 1)
+
+    def test_throttled_pauses_limiter(self):
+        limiter = challonge.configure_rate_limit(1000)
+        self._stub(_response(429, "", {"Retry-After": "0.05"}))
+        self.assertRaises(requests.HTTPError, challonge.matches.index, 1)
+        self.assertTrue(limiter.acquire() > 0)
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        challonge.add_hook(self.events.append)
+
+    def tearDown(self):
+        challonge.remove_hook(self.events.append)
+        challonge.api.set_pool(None)
+        challonge.api.set_retry_policy(None)
+
+    def test_endpoint(self):
+        endpoint = challonge.metrics.endpoint
+        self.assertEqual(endpoint("tournaments"), "tournaments")
+        self.assertEqual(
+            endpoint("tournaments/my_url/matches/42/attachments"),
+            "tournaments/:tournament/matches/:match/attachments",
+        )
+        self.assertEqual(
+            endpoint("tournaments/1/participants/bulk_add"),
+            "tournaments/:tournament/participants/bulk_add",
+        )
+
+    def test_events(self):
+        challonge.configure_retries(backoff=0.001)
+        responses = [_response(503, ""), _response(200, '[{"match": {"id": 1}}]')]
+        challonge.api.set_pool(_StubPool(lambda method, url, kwargs: responses.pop(0)))
+        challonge.matches.index(1)
+
+        challonge.api.set_pool(_StubPool(lambda method, url, kwargs: _response(422, "{}")))
+        challonge.matches.update(1, 2, scores_csv="1-0")
+
+        challonge.api.set_pool(_StubPool(lambda method, url, kwargs: _response(404, "")))
+        self.assertRaises(requests.HTTPError, challonge.matches.show, 1, 2)
+
+        get, put, error = self.events
+        self.assertEqual(get.endpoint, "tournaments/:tournament/matches")
+        self.assertEqual((get.status, get.retries, get.bytes_in), (200, 1, 22))
+        self.assertTrue(get.wait > 0 and get.parse > 0 and get.total >= get.parse)
+        self.assertIsNone(get.error)
+        self.assertEqual((put.method, put.status), ("PUT", 422))
+        self.assertEqual(put.bytes_out, len("match%5Bscores_csv%5D=1-0"))
+        self.assertEqual(error.status, 404)
+        self.assertIsInstance(error.error, requests.HTTPError)
+
+    def test_request_metrics(self):
+        metrics = challonge.metrics.RequestMetrics()
+        challonge.add_hook(metrics)
+        try:
+            challonge.api.set_pool(_StubPool(lambda method, url, kwargs: _response(200, "[]")))
+            for _ in range(10):
+                challonge.matches.index(1)
+            challonge.participants.index(1)
+        finally:
+            challonge.remove_hook(metrics)
+
+        summary = metrics.summary()
+        item = summary[("GET", "tournaments/:tournament/matches")]
+        self.assertEqual((item["count"], item["errors"], item["bytes_in"]), (10, 0, 20))
+        self.assertTrue(item["p50"] <= item["p95"] <= item["p99"])
+        text = metrics.export()
+        self.assertIn(
+            'challonge_requests_total{method="GET",endpoint="tournaments/:tournament/matches"} 10',
+            text,
+        )
+        self.assertIn('quantile="0.99"', text)
+
+
+class BulkUpdateTestCase(unittest.TestCase):
+    # 1 and 2 feed 3, which feeds 4
+    matches = [
+        {"id": 1, "player1_prereq_match_id": None, "player2_prereq_match_id": None},
+        {"id": 2, "player1_prereq_match_id": None, "player2_prereq_match_id": None},
+        {"id": 3, "player1_prereq_match_id": 1, "player2_prereq_match_id": 2},
+        {"id": 4, "player1_prereq_match_id": 3, "player2_prereq_match_id": None},
+    ]
+
+    def setUp(self):
+        self.order = []
+        self.fail = set()
+
+        def handler(method, url, kwargs):
+            if url.endswith("/matches.json"):
+                return _response(500, "{}")
+            match_id = int(url.rsplit("/", 1)[1].split(".")[0])
+            self.order.append(match_id)
+            return _response(500 if match_id in self.fail else 200, "{}")
+
+        challonge.api.set_pool(_StubPool(handler))
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+
+    def test_order(self):
+        updates = [{"match_id": i, "scores_csv": "1-0", "winner_id": 9} for i in (4, 3, 2, 1)]
+        res = challonge.matches.bulk_update("t", updates, matches=self.matches)
+
+        self.assertTrue(res.ok)
+        self.assertEqual(sorted(res), [1, 2, 3, 4])
+        self.assertEqual(sorted(self.order[:2]), [1, 2])
+        self.assertEqual(self.order[2:], [3, 4])
+
+    def test_failed_prerequisite(self):
+        self.fail.add(2)
+        updates = [{"match_id": i, "scores_csv": "1-0"} for i in (1, 2, 3, 4)]
+        res = challonge.matches.bulk_update("t", updates, matches=self.matches)
+
+        self.assertEqual(list(res), [1])
+        self.assertIsInstance(res.errors[2], requests.HTTPError)
+        self.assertIsInstance(res.errors[3], challonge.ChallongeException)
+        self.assertIsInstance(res.errors[4], challonge.ChallongeException)
+        self.assertNotIn(3, self.order)
+
+    def test_failed_index(self):
+        updates = [{"match_id": i, "scores_csv": "1-0"} for i in (1, 2)]
+        res = challonge.matches.bulk_update("t", updates)
+
+        self.assertEqual(list(res), [])
+        self.assertEqual(sorted(res.errors), [1, 2])
+        self.assertIsInstance(res.errors[1], requests.HTTPError)
+        self.assertEqual(self.order, [])
+
+
+class BracketIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        def match(id, state, round, identifier, p1, p2, prereq1=None, prereq2=None):
+            return {
+                "id": id,
+                "state": state,
+                "round": round,
+                "identifier": identifier,
+                "player1_id": p1,
+                "player2_id": p2,
+                "player1_prereq_match_id": prereq1,
+                "player2_prereq_match_id": prereq2,
+                "player1_is_prereq_match_loser": False,
+                "player2_is_prereq_match_loser": False,
+            }
+
+        self.match = match
+        self.index = challonge.bracket.BracketIndex(
+            [
+                match(1, "complete", 1, "A", 10, 20),
+                match(2, "open", 1, "B", 30, 40),
+                match(3, "pending", 2, "C", 10, None, 1, 2),
+            ]
+        )
+
+    def test_lookups(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.by_identifier("B")["id"], 2)
+        self.assertEqual([m["id"] for m in self.index.open_matches()], [2])
+        self.assertEqual(sorted(m["id"] for m in self.index.matches_of(10)), [1, 3])
+        self.assertEqual([m["id"] for m in self.index.matches_in_round(2)], [3])
+        self.assertEqual([m["id"] for m in self.index.waiting_on(2)], [3])
+        self.assertEqual(self.index.advances_to(1)["id"], 3)
+        self.assertIsNone(self.index.advances_to(1, loser=True))
+        self.assertEqual(self.index.next_match(10)["id"], 3)
+        self.assertEqual(self.index.next_match(30)["id"], 2)
+        self.assertIsNone(self.index.next_match(20))
+
+    def test_update(self):
+        self.index.update(self.match(2, "complete", 1, "B", 30, 40))
+        self.index.update(self.match(3, "open", 2, "C", 10, 30, 1, 2))
+
+        self.assertEqual([m["id"] for m in self.index.open_matches()], [3])
+        self.assertEqual(self.index.matches_in_state("pending"), [])
+        self.assertEqual(self.index.next_match(30)["id"], 3)
+
+
+class SyncTestCase(unittest.TestCase):
+    def setUp(self):
+        self.matches = [
+            {"match": {"id": 1, "state": "open", "updated_at": "2021-03-28T12:00:00Z"}},
+            {"match": {"id": 2, "state": "open", "updated_at": "2021-03-28T12:00:00Z"}},
+        ]
+
+        def handler(method, url, kwargs):
+            if url.endswith("/matches.json"):
+                return _response(200, json.dumps(self.matches))
+            return _response(200, "[]")
+
+        self.pool = _StubPool(handler)
+        challonge.api.set_pool(self.pool)
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+
+    def test_poll(self):
+        events = []
+        sync = challonge.sync.TournamentSync("t")
+        sync.add_callback(events.append)
+
+        self.assertEqual([(e.kind, e.id) for e in sync.poll()], [("added", 1), ("added", 2)])
+        self.assertEqual(sync.poll(), [])
+
+        self.matches[0] = {
+            "match": {"id": 1, "state": "complete", "updated_at": "2021-03-28T12:05:00Z"}
+        }
+        self.matches[1:] = [{"match": {"id": 3, "state": "open", "updated_at": None}}]
+        changes = sync.poll()
+
+        self.assertEqual(
+            [(e.kind, e.resource, e.id) for e in changes],
+            [("changed", "matches", 1), ("added", "matches", 3), ("removed", "matches", 2)],
+        )
+        self.assertEqual(changes[0].record["state"], "complete")
+        self.assertEqual(changes[0].previous["state"], "open")
+        self.assertEqual(len(events), 5)
+        self.assertEqual(sorted(m["id"] for m in sync.records("matches")), [1, 3])
+
+
+class PollSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.states = {"live": "underway", "old": "complete"}
+
+        def handler(method, url, kwargs):
+            t = url.split("/")[-2] if url.endswith("/matches.json") else None
+            if t is not None:
+                return _response(200, "[]")
+            t = url.rsplit("/", 1)[1].split(".")[0]
+            return _response(200, json.dumps({"tournament": {"state": self.states[t]}}))
+
+        challonge.api.set_pool(_StubPool(handler))
+        self.scheduler = challonge.scheduler.PollScheduler(requests_per_second=1000)
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+
+    def test_intervals(self):
+        polls = []
+        self.scheduler.add_callback(lambda t, record, events: polls.append(t))
+        self.scheduler.add("live")
+        self.scheduler.add("old")
+
+        self.assertEqual(self.scheduler.tick(), 2)
+        self.assertEqual(sorted(polls), ["live", "old"])
+        self.assertEqual(self.scheduler.interval("live"), 5.0)
+        self.assertEqual(self.scheduler.interval("old"), 900.0)
+        self.assertEqual(self.scheduler.tick(), 0)
+
+        watch = self.scheduler._watches["live"]
+        self.scheduler._adapt(watch, "underway", changed=False)
+        self.assertEqual(self.scheduler.interval("live"), 7.5)
+        self.scheduler._adapt(watch, "underway", changed=True)
+        self.scheduler._adapt(watch, "underway", changed=True)
+        self.assertEqual(self.scheduler.interval("live"), 2.0)
+
+    def test_remove(self):
+        self.scheduler.add("live")
+        self.scheduler.remove("live")
+        self.assertEqual(self.scheduler.tick(), 0)
+
+    def test_failing_callback(self):
+        errors = []
+        self.scheduler.on_error = lambda t, e: errors.append((t, e))
+
+        def callback(t, record, events):
+            raise ValueError(t)
+
+        self.scheduler.add_callback(callback)
+        self.scheduler.add("live")
+        self.assertEqual(self.scheduler.tick(), 1)
+        self.assertEqual([(t, type(e)) for t, e in errors], [("live", ValueError)])
+        self.assertEqual(len(self.scheduler._heap), 1)
+
+
+class FakeChallongeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fake = challonge.fake.FakeChallonge(seed=1)
+        challonge.api.set_pool(self.fake)
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+
+    def test_bracket(self):
+        t = challonge.tournaments.create(_get_random_name(), _get_random_name())
+        challonge.participants.bulk_add(t["id"], ["a", "b", "c", "d", "e"])
+        challonge.tournaments.start(t["id"])
+
+        ms = challonge.matches.index(t["id"])
+        self.assertEqual(len(ms), 4)
+        self.assertEqual(len(challonge.matches.index(t["id"], state="open")), 2)
+
+        while True:
+            ms = challonge.matches.index(t["id"], state="open")
+            if not ms:
+                break
+            for m in ms:
+                challonge.matches.update(
+                    t["id"], m["id"], scores_csv="1-0", winner_id=m["player1_id"]
+                )
+
+        self.assertEqual(challonge.tournaments.show(t["id"])["state"], "awaiting_review")
+        challonge.tournaments.finalize(t["id"])
+        ranks = dict((p["name"], p["final_rank"]) for p in challonge.participants.index(t["id"]))
+        self.assertEqual(ranks, {"a": 1, "b": 2, "c": 3, "d": 3, "e": 5})
+
+    def test_reopen(self):
+        t = challonge.tournaments.create("t", "t")
+        challonge.participants.bulk_add(t["id"], ["a", "b", "c", "d"])
+        challonge.tournaments.start(t["id"])
+        m1, m2, final = challonge.matches.index(t["id"])
+        for m in (m1, m2):
+            challonge.matches.update(t["id"], m["id"], winner_id=m["player2_id"])
+        self.assertEqual(challonge.matches.show(t["id"], final["id"])["state"], "open")
+
+        challonge.matches.reopen(t["id"], m1["id"])
+        final = challonge.matches.show(t["id"], final["id"])
+        self.assertEqual(final["state"], "pending")
+        self.assertIsNone(final["player1_id"])
+
+    def test_injected_errors(self):
+        self.fake.error_rate = 1.0
+        self.fake.error_statuses = (503,)
+        self.assertRaises(requests.HTTPError, challonge.tournaments.index)
+
+        self.fake.error_rate = 0.0
+        self.fake.rate_limit = 1
+        with self.assertRaises(requests.HTTPError) as cm:
+            for _ in range(5):
+                challonge.tournaments.index()
+        self.assertEqual(cm.exception.response.status_code, 429)
+        self.assertEqual(cm.exception.response.headers["Retry-After"], "1")
+
+
+class ScanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fake = challonge.fake.FakeChallonge(seed=1)
+        challonge.api.set_pool(self.fake)
+        dates = ["2024-06-30", "2024-06-20", "2024-06-19", "2024-05-20", "2024-03-01", "2023-01-01"]
+        for i, date in enumerate(dates):
+            t = challonge.tournaments.create("t%d" % i, "t%d" % i)
+            self.fake._tournaments[t["id"]]["created_at"] = date + "T12:00:00.000+00:00"
+        self.ids = [t["id"] for t in challonge.tournaments.index()]
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+
+    def _scan(self, **params):
+        return [t["id"] for t in challonge.tournaments.scan(created_before="2024-06-30", **params)]
+
+    def test_windows(self):
+        count = self.fake.request_count
+        self.assertEqual(self._scan(window=30), self.ids)
+        # 2 windows, 1 empty window and the open-ended request
+        self.assertEqual(self.fake.request_count - count, 4)
+
+        self.assertEqual(self._scan(window=1, created_after="2024-06-19"), self.ids[:3])
+        self.assertEqual(
+            self._scan(window=10, created_after=datetime.date(2024, 3, 1)), self.ids[:5]
+        )
+        self.assertEqual(self._scan(state="ended"), [])
+
+    def test_stop_early(self):
+        count = self.fake.request_count
+        scan = challonge.tournaments.scan(created_before="2024-06-30", window=2)
+        self.assertEqual(next(scan)["id"], self.ids[0])
+        scan.close()
+        self.assertEqual(self.fake.request_count - count, 1)
+
+    def test_invalid_window(self):
+        count = self.fake.request_count
+        for window in (0, -1):
+            self.assertRaises(ValueError, challonge.tournaments.scan, window=window)
+        self.assertEqual(self.fake.request_count, count)
+
+
+class ClientTestCase(unittest.TestCase):
+    def test_settings(self):
+        client = challonge.Challonge("user", "key", timezone="UTC", record_type="lazy")
+        self.assertEqual(client.get_credentials(), ("user", "key"))
+        self.assertEqual(client.get_timezone().zone, "UTC")
+        self.assertEqual(client.get_record_type(), "lazy")
+        self.assertEqual(challonge.get_record_type(), "dict")
+        self.assertIsNot(client.get_pool(), challonge.api.get_pool())
+        self.assertRaises(ValueError, challonge.Challonge, datetime_type="date")
+
+        challonge.set_user_agent("agent")
+        try:
+            self.assertEqual(challonge.get_user_agent(), "agent")
+            if sys.version_info >= (3, 7):
+                self.assertEqual(challonge.api.user_agent, "agent")
+        finally:
+            challonge.set_user_agent(challonge.api.USER_AGENT)
+
+        if sys.version_info >= (3, 7):
+            challonge.set_timezone()
+            self.assertIsNotNone(challonge.api.tz)
+            challonge.set_timezone("UTC")
+            try:
+                self.assertEqual(challonge.api.tz.zone, "UTC")
+            finally:
+                challonge.set_timezone()
+
+        self.assertIs(challonge.api.get_client().tournaments, challonge.tournaments._default)
+        self.assertIs(client.matches, client.matches)
+        self.assertIs(client.matches._client, client)
+
+    def test_tenants(self):
+        def handler(method, url, kwargs):
+            body = '{"tournament": {"id": 1, "name": "%s"}}' % kwargs["auth"][0]
+            return _response(200, body)
+
+        clients = [
+            challonge.Challonge("user%d" % i, "key%d" % i, pool=_StubPool(handler))
+            for i in range(4)
+        ]
+        res = challonge.batch.run_many(
+            lambda c: [c.tournaments.show(1)["name"] for _ in range(20)], clients, max_workers=4
+        )
+        for i, client in enumerate(clients):
+            self.assertEqual(res[client], ["user%d" % i] * 20)
+            auths = set(kwargs["auth"] for _, _, kwargs in client.get_pool().calls)
+            self.assertEqual(auths, set([("user%d" % i, "key%d" % i)]))
+
+    def test_fake_backends(self):
+        with challonge.Challonge(pool=challonge.fake.FakeChallonge(seed=1)) as a:
+            b = challonge.Challonge(pool=challonge.fake.FakeChallonge(seed=1))
+            b.configure_cache(ttl=60)
+            t = a.tournaments.create("t", "t")
+            a.participants.bulk_add(t["id"], ["a", "b"])
+
+            self.assertEqual(len(a.participants.index(t["id"])), 2)
+            self.assertEqual(b.tournaments.index(), [])
+            self.assertIsNone(a.get_cache())
+            self.assertIsNone(challonge.api.get_cache())
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fake = challonge.fake.FakeChallonge(seed=1)
+        challonge.api.set_pool(self.fake)
+        self.store = challonge.configure_store(":memory:")
+
+    def tearDown(self):
+        challonge.api.set_pool(None)
+        challonge.api.set_store(None)
+        self.store.close()
+
+    def _complete(self, url):
+        t = challonge.tournaments.create(url, url)
+        challonge.participants.bulk_add(t["id"], ["a", "b"])
+        challonge.tournaments.start(t["id"])
+        [m] = challonge.matches.index(t["id"])
+        challonge.matches.update(t["id"], m["id"], scores_csv="1-0", winner_id=m["player1_id"])
+        challonge.tournaments.finalize(t["id"])
+        return t
+
+    def test_serves_completed_tournaments(self):
+        t = self._complete("done")
+        pending = challonge.tournaments.create("pending", "pending")
+        challonge.tournaments.show(pending["id"])
+        self.assertEqual(challonge.tournaments.show(t["id"])["state"], "complete")
+        ms = challonge.matches.index("done")
+        self.assertEqual(len(self.store), 1)
+
+        requests_sent = self.fake.request_count
+        self.assertEqual(challonge.matches.index("done"), ms)
+        self.assertEqual(list(challonge.matches.iter_index(t["id"])), ms)
+        self.assertEqual(self.fake.request_count, requests_sent)
+        # the tournament record is always requested
+        challonge.tournaments.show(t["id"])
+        self.assertEqual(self.fake.request_count, requests_sent + 1)
+
+        challonge.tournaments.reset("done")
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(challonge.tournaments.show(t["id"])["state"], "pending")
+        self.assertEqual(len(self.store), 0)
+
+    def test_reset_elsewhere(self):
+        t = self._complete("done")
+        challonge.tournaments.show(t["id"])
+        challonge.participants.index(t["id"])
+        self.assertEqual(len(self.store), 1)
+
+        challonge.Challonge(pool=self.fake).tournaments.reset(t["id"])
+        self.assertEqual(challonge.tournaments.show(t["id"])["state"], "pending")
+        self.assertEqual(len(self.store), 0)
+
+    def test_warm(self):
+        t = self._complete("done")
+        pending = challonge.tournaments.create("pending", "pending")
+        challonge.api.set_store(None)
+        res = self.store.warm([t["id"], pending["id"], "missing"])
+        self.assertEqual(dict(res), {t["id"]: True, pending["id"]: False})
+        self.assertIsInstance(res.errors["missing"], requests.HTTPError)
+        self.assertEqual(len(self.store), 2)
+
+        challonge.api.set_store(self.store)
+        requests_sent = self.fake.request_count
+        challonge.participants.index("done")
+        self.assertEqual(self.fake.request_count, requests_sent)
+
+    def test_schema_version(self):
+        path = os.path.join(tempfile.mkdtemp(), "store.sqlite")
+        store = challonge.store.TournamentStore(path)
+        store._learn(None, {"id": 1, "state": "complete"})
+        store.offer("tournaments/1/matches", [], b"[]")
+        store.close()
+        store = challonge.store.TournamentStore(path)
+        self.assertEqual(store.get("tournaments/1/matches", []), b"[]")
+        store.close()
+
+        challonge.store.SCHEMA_VERSION += 1
+        try:
+            store = challonge.store.TournamentStore(path)
+            self.assertIsNone(store.get("tournaments/1/matches", []))
+            store.close()
+        finally:
+            challonge.store.SCHEMA_VERSION -= 1
+
+
+class _AioStubResponse(object):
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    def read(self):
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(self.body.encode("utf-8"))
+        return future
+
+    def raise_for_status(self):
+        raise RuntimeError(self.status)
+
+
+class _AioStubPool(object):
+    def __init__(self, status, body):
+        self.response = _AioStubResponse(status, body)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(self.response)
+        return future
+
+
+class _AioSlowPool(_AioStubPool):
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        loop.call_later(0.05, future.set_result, self.response)
+        return future
+
+
+@unittest.skipIf(aio is None, "aiohttp is not installed")
+class AioTestCase(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        aio.api.set_pool(None)
+        self.loop.close()
+
+    def _run(self, status, body, coro_func, *args, **kwargs):
+        pool = _AioStubPool(status, body)
+        aio.api.set_pool(pool)
+        return pool, self.loop.run_until_complete(coro_func(*args, **kwargs))
+
+    def test_index(self):
+        body = '[{"match": {"id": 1, "state": "open", "underway_at": null}}]'
+        pool, ms = self._run(200, body, aio.matches.index, 10, state="open")
+
+        method, url, kwargs = pool.calls[0]
+        self.assertEqual(method, "GET")
+        self.assertTrue(url.endswith("/tournaments/10/matches.json"))
+        self.assertEqual(kwargs["params"], [("state", "open")])
+        self.assertEqual(ms, [{"id": 1, "state": "open", "underway_at": None}])
+
+    def test_update(self):
+        pool, _ = self._run(200, "{}", aio.matches.update, 10, 1, scores_csv="1-0", winner_id=None)
+
+        method, url, kwargs = pool.calls[0]
+        self.assertEqual(method, "PUT")
+        self.assertEqual(kwargs["data"], [("match[scores_csv]", "1-0")])
+
+    def test_coalescing(self):
+        pool = _AioSlowPool(200, '[{"match": {"id": 1}}]')
+        aio.api.set_pool(pool)
+
+        def index_all():
+            return asyncio.gather(*(aio.matches.index(10) for _ in range(5)))
+
+        asyncio.set_event_loop(self.loop)
+        challonge.set_coalescing()
+        try:
+            res = self.loop.run_until_complete(index_all())
+            coalesced = len(pool.calls)
+            challonge.set_coalescing(False)
+            self.loop.run_until_complete(index_all())
+        finally:
+            challonge.set_coalescing(False)
+            asyncio.set_event_loop(None)
+        self.assertEqual(coalesced, 1)
+        self.assertEqual(res, [[{"id": 1}]] * 5)
+        self.assertEqual(len(pool.calls), 6)
+        self.assertEqual(aio.api._flights, {})
+
+    def test_application_error(self):
+        self.assertRaises(
+            challonge.ChallongeException,
+            self._run,
+            422,
+            '{"errors": ["Name can\'t be blank"]}',
+            aio.tournaments.create,
+            "",
+            "url",
+        )
+
+
 class TournamentsTestCase(unittest.TestCase):
     def setUp(self):
-        challonge.set_credentials(username, api_key)
+        _connect()
         self.random_name = _get_random_name()
 
         self.t = challonge.tournaments.create(self.random_name, self.random_name)
@@ -171,7 +1407,7 @@ class TournamentsTestCase(unittest.TestCase):
 
 class ParticipantsTestCase(unittest.TestCase):
     def setUp(self):
-        challonge.set_credentials(username, api_key)
+        _connect()
         self.t_name = _get_random_name()
         self.ps_names = [_get_random_name(), _get_random_name()]
         self.t = challonge.tournaments.create(self.t_name, self.t_name)
@@ -264,7 +1500,7 @@ class ParticipantsTestCase(unittest.TestCase):
 
 class MatchesTestCase(unittest.TestCase):
     def setUp(self):
-        challonge.set_credentials(username, api_key)
+        _connect()
         self.t_name = _get_random_name()
 
         self.t = challonge.tournaments.create(self.t_name, self.t_name)
@@ -329,7 +1565,7 @@ class MatchesTestCase(unittest.TestCase):
 
 class AttachmentsTestCase(unittest.TestCase):
     def setUp(self):
-        challonge.set_credentials(username, api_key)
+        _connect()
         self.t_name = _get_random_name()
 
         self.t = challonge.tournaments.create(self.t_name, self.t_name, accept_attachments=True)
@@ -483,10 +1719,11 @@ class AttachmentsTestCase(unittest.TestCase):
 if __name__ == "__main__":
     username = os.environ.get("CHALLONGE_USER")
     api_key = os.environ.get("CHALLONGE_KEY")
-    if not username or not api_key:
+    if (not username or not api_key) and live_pool is None:
         raise RuntimeError(
             "You must add CHALLONGE_USER and CHALLONGE_KEY \
-            to your environment variables to run the test suite"
+            to your environment variables to run the test suite \
+            or set CHALLONGE_FAKE to run it against challonge.fake"
         )
 
     unittest.main()